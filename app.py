@@ -1,23 +1,43 @@
-from flask import Flask, jsonify, request
+from flask import Flask, request
 from flask_cors import CORS
-from liquidation_hunter import analyze_symbol, POPULAR_SYMBOLS
-import json
+from liquidation_hunter import analyze_symbol, start_stream_cache, POPULAR_SYMBOLS
+import orjson
 import os
+import time
 import asyncio
 import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import atexit
+import threading
+import concurrent.futures
+import collections
+import heapq
+import itertools
+
+try:
+    import fcntl  # File lock untuk pilih satu worker pemilik Telegram (Linux)
+except ImportError:
+    fcntl = None
 
 # 🔥 IMPORT UNTUK TELEGRAM
-from telethon import TelegramClient
+from telethon import TelegramClient, events
+from telethon.sessions import StringSession
 from telethon.tl.types import PeerChannel
 import re
 
 app = Flask(__name__)
 CORS(app)
 
+def ojsonify(obj, status=200):
+    """Pengganti jsonify berbasis orjson (encode jauh lebih cepat untuk list of dict)"""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
 # ==================== KONFIGURASI TELEGRAM ====================
 # 🔥 Ambil dari environment variables (set di Koyeb)
 TELEGRAM_CONFIG = {
@@ -25,17 +45,85 @@ TELEGRAM_CONFIG = {
     'api_hash': os.environ.get('API_HASH', ''),  # GANTI DENGAN API_HASH-mu via env var
     'channel_username': 'BinanceWhaleVolumeAlerts',
     'channel_id': None,  # Akan diisi otomatis
-    'session_file': '/tmp/whale_scraper_session'  # 🔥 Pakai /tmp untuk writeable di Koyeb
+    'channel_entity': None,  # Entity channel hasil resolve di init_telegram
+    # 🔥 StringSession dari env var - tidak ada file SQLite, tidak perlu login ulang tiap deploy
+    'session_string': os.environ.get('TG_SESSION', '')
 }
 
 # Inisialisasi client Telegram (akan di-start nanti)
 telegram_client = None
-whale_messages_cache = []
+# Buffer internal (hanya ditulis di bawah _cache_lock), terbaru di depan
+_wm_buffer = collections.deque(maxlen=200)
+_seen_msg_ids = collections.OrderedDict()  # id pesan Telegram yang sudah diproses (LRU)
+_SEEN_MSG_IDS_MAX = 1024
+
+# Statistik whale alerts, di-update saat pesan masuk/keluar cache (bukan per request)
+_stats = {'long': 0, 'short': 0, 'pairs': collections.Counter()}
+# Index per pair (terbaru di depan) supaya filter ?pair= cukup O(limit)
+_pair_index = {}
+# pair -> urutan insert pesan terbarunya; tie-break top_pairs (count sama -> pair dengan
+# pesan lebih baru duluan, sama seperti urutan scan cache terbaru-dulu versi lama)
+_pair_newest = {}
+_insert_seq = itertools.count()
+_cache_lock = threading.Lock()  # Jaga buffer, statistik, dan index tetap sinkron (sisi writer)
+# Snapshot immutable yang dibaca route: (pesan terbaru dulu, {pair: tuple}, (long, short, top 5 pair))
+# Diganti utuh dalam satu assignment tiap update - route baca global ini SEKALI supaya
+# pesan, index pair, dan statistik selalu dari publish yang sama (tanpa lock)
+_whale_view = ((), {}, (0, 0, ()))
 last_update_time = None
 
 # Flag untuk inisialisasi sekali
 app_initialized = False
 
+# ==================== MULTI-WORKER (GUNICORN) ====================
+# Hanya satu worker per host yang pegang Telethon + scheduler ('owner'). Owner
+# menulis snapshot cache ke file, worker lain ('reader') membaca file itu.
+# 'solo' = tidak ada sharing (Telegram nonaktif atau fcntl tidak tersedia).
+# Reader mencoba ambil lock lagi (tiap WHALE_OWNER_RETRY detik, saat sync) supaya kalau
+# owner lama exit - mis. graceful reload (HUP) - salah satu reader jadi owner baru.
+WHALE_LOCK_FILE = '/tmp/whale_worker.lock'
+WHALE_SHARED_FILE = '/tmp/whale_cache.json'
+WHALE_OWNER_RETRY = 5.0
+_whale_role = 'solo'
+_owner_lock_fd = None  # Dibiarkan terbuka selama proses hidup supaya lock tetap dipegang
+_shared_mtime = 0.0
+_owner_connected = False  # Reader: status Telegram di worker owner (dari snapshot)
+_next_owner_try = 0.0  # Reader: monotonic time percobaan ambil alih lock berikutnya
+_takeover_lock = threading.Lock()
+
+# Thread pool untuk /analyze - analyze_symbol I/O-bound (HTTP ke Binance)
+_ANALYZE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(POPULAR_SYMBOLS)))
+
+# Cache hasil analyze_symbol per symbol (TTL pendek) + single-flight
+_ANALYZE_TTL = 20  # detik
+_ANALYZE_CACHE_MAX = 256
+_ANALYZE_CACHE = {}  # symbol -> (expiry, result)
+_ANALYZE_INFLIGHT = {}  # symbol -> Future milik thread yang sedang menghitung
+_ANALYZE_LOCK = threading.Lock()
+
+# Regex parser pesan whale (di-compile sekali saat import)
+# Satu pass untuk semua field: pair -> volume -> price -> sequence.
+# Volume/price/sequence opsional, sama seperti parser lama. Type (LONG/SHORT)
+# sudah ditentukan caller lewat substring check, jadi tidak di-regex lagi.
+_RE_WHALE = re.compile(
+    r'#(?P<pair>\w+)'
+    r'(?:.*?(?:Short|Long) Volume\s*:\s*\$(?P<vol>\d+k?)\s*\(%(?P<volp>[\d.]+)\))?'
+    r'(?:.*?Price\s*:\s*(?P<price>[\d.]+))?'
+    r'(?:.*?Sequence\s*:\s*(?P<seq>\d+))?',
+    re.DOTALL
+)
+_RE_CONF = re.compile(r'[🔴🟢]')
+
+# Timestamp ISO untuk metadata response, di-format ulang paling cepat tiap 250ms
+_now_cache = [0.0, ""]
+
+def _now_iso():
+    """datetime.now().isoformat() versi cache (cukup presisi untuk metadata)"""
+    t = time.time()
+    if t - _now_cache[0] > 0.25:
+        _now_cache[:] = [t, datetime.fromtimestamp(t).isoformat()]
+    return _now_cache[1]
+
 # ==================== FUNGSI TELEGRAM SCRAPER ====================
 async def init_telegram():
     """Inisialisasi koneksi Telegram"""
@@ -49,17 +137,25 @@ async def init_telegram():
     try:
         print(f"🔄 Connecting to Telegram with API ID: {TELEGRAM_CONFIG['api_id']}")
         telegram_client = TelegramClient(
-            TELEGRAM_CONFIG['session_file'], 
+            StringSession(TELEGRAM_CONFIG['session_string']), 
             TELEGRAM_CONFIG['api_id'], 
             TELEGRAM_CONFIG['api_hash']
         )
         await telegram_client.start()
         
+        # Login pertama (TG_SESSION kosong): print session supaya bisa disimpan ke env var
+        if not TELEGRAM_CONFIG['session_string']:
+            print(f"🔑 Set TG_SESSION env var to reuse this login: {telegram_client.session.save()}")
+        
         # Dapatkan entity channel
         entity = await telegram_client.get_entity(TELEGRAM_CONFIG['channel_username'])
         TELEGRAM_CONFIG['channel_id'] = entity.id
+        TELEGRAM_CONFIG['channel_entity'] = entity
         print(f"✅ Telegram connected! Channel: {entity.title} (ID: {entity.id})")
         
+        # Push update: pesan baru langsung masuk cache tanpa polling
+        telegram_client.add_event_handler(on_new_whale_message, events.NewMessage(chats=entity))
+        
         return True
     except Exception as e:
         print(f"❌ Telegram init failed: {e}")
@@ -67,55 +163,257 @@ async def init_telegram():
 
 async def fetch_whale_messages(limit=50):
     """Ambil pesan terbaru dari channel"""
-    global telegram_client, whale_messages_cache, last_update_time
+    global telegram_client, last_update_time
     
     if not telegram_client:
         print("⚠️ Telegram client not initialized")
         return []
     
     try:
-        entity = await telegram_client.get_entity(TELEGRAM_CONFIG['channel_username'])
+        # Pakai entity yang sudah di-resolve saat init (hemat 1 round trip MTProto)
+        entity = TELEGRAM_CONFIG['channel_entity']
+        if entity is None:
+            entity = await telegram_client.get_entity(TELEGRAM_CONFIG['channel_username'])
+            TELEGRAM_CONFIG['channel_entity'] = entity
         messages = []
         
-        # Iterasi pesan terbaru
-        async for msg in telegram_client.iter_messages(entity, limit=limit):
-            if msg.text and ('LONG' in msg.text or 'SHORT' in msg.text or '💰' in msg.text):
-                # Parse pesan whale
-                parsed = parse_whale_message(msg.text, msg.date)
-                if parsed:
-                    messages.append(parsed)
+        # Iterasi pesan terbaru - min_id bikin server skip pesan yang sudah pernah diproses
+        min_id = max(_seen_msg_ids, default=0)
+        async for msg in telegram_client.iter_messages(entity, limit=limit, min_id=min_id):
+            if not mark_message_seen(msg.id):
+                continue
+            parsed = parse_telegram_message(msg)
+            if parsed:
+                messages.append(parsed)
         
-        whale_messages_cache = messages
+        # Pesan di sini lebih baru dari min_id, tapi push handler bisa sudah memasukkan pesan yang
+        # lebih baru lagi selama iter_messages - add_whale_messages menyusun ulang kalau perlu
+        add_whale_messages(messages)
         last_update_time = datetime.now()
-        print(f"✅ Fetched {len(messages)} whale messages")
+        publish_whale_cache()
+        print(f"✅ Fetched {len(messages)} new whale messages")
         return messages
         
     except Exception as e:
         print(f"❌ Fetch failed: {e}")
-        return whale_messages_cache  # Return cache jika gagal
+        return list(_whale_view[0])  # Return cache jika gagal
+
+async def on_new_whale_message(event):
+    """Handler events.NewMessage - parse pesan baru dan taruh di depan cache"""
+    global last_update_time
+    
+    if not mark_message_seen(event.message.id):
+        return
+    
+    parsed = parse_telegram_message(event.message)
+    if parsed:
+        add_whale_messages([parsed])
+        last_update_time = datetime.now()
+        publish_whale_cache()
+
+def _count_message(msg, delta):
+    """Update counter statistik untuk satu pesan (delta +1 masuk, -1 keluar)"""
+    if msg['type'] == 'LONG':
+        _stats['long'] += delta
+    elif msg['type'] == 'SHORT':
+        _stats['short'] += delta
+    
+    pairs = _stats['pairs']
+    pairs[msg['pair']] += delta
+    if pairs[msg['pair']] <= 0:
+        del pairs[msg['pair']]
+
+def add_whale_messages(messages):
+    """Taruh pesan (urutan terbaru dulu) di depan cache, update statistik dan index pair"""
+    with _cache_lock:
+        head_id = _wm_buffer[0].get('id') if _wm_buffer else None
+        if head_id is not None and any(msg.get('id') is not None and msg['id'] < head_id for msg in messages):
+            # Ada pesan lebih lama dari head (poll balapan dengan push handler) - susun ulang by id
+            # supaya cache tetap terbaru-dulu (id pesan Telegram naik per channel)
+            merged = sorted(itertools.chain(_wm_buffer, messages), key=lambda msg: msg.get('id', 0), reverse=True)
+            _reset_cache_locked()
+            _add_whale_messages_locked(merged[:_wm_buffer.maxlen])
+        else:
+            _add_whale_messages_locked(messages)
+
+def _reset_cache_locked():
+    """Kosongkan buffer, statistik, dan index - caller wajib pegang _cache_lock"""
+    _wm_buffer.clear()
+    _stats['long'] = _stats['short'] = 0
+    _stats['pairs'].clear()
+    _pair_index.clear()
+    _pair_newest.clear()
+
+def _add_whale_messages_locked(messages):
+    """Isi add_whale_messages - caller wajib pegang _cache_lock"""
+    for msg in reversed(messages):
+        # deque penuh -> pesan paling lama akan terbuang oleh appendleft
+        if len(_wm_buffer) == _wm_buffer.maxlen:
+            evicted = _wm_buffer[-1]
+            _count_message(evicted, -1)
+            # Pesan paling lama di cache pasti juga paling lama di index pair-nya
+            pair_msgs = _pair_index[evicted['pair']]
+            pair_msgs.pop()
+            if not pair_msgs:
+                del _pair_index[evicted['pair']]
+                del _pair_newest[evicted['pair']]
+        _wm_buffer.appendleft(msg)
+        _count_message(msg, 1)
+        _pair_index.setdefault(msg['pair'], collections.deque()).appendleft(msg)
+        _pair_newest[msg['pair']] = next(_insert_seq)
+    
+    _publish_views_locked()
+
+def _publish_views_locked():
+    """Ganti snapshot reader dengan salinan baru (satu assignment referensi, atomic di CPython)"""
+    global _whale_view
+    
+    _whale_view = (
+        tuple(_wm_buffer),
+        {pair: tuple(msgs) for pair, msgs in _pair_index.items()},
+        (_stats['long'], _stats['short'], _top_pairs_locked(5))
+    )
+
+def _top_pairs_locked(n):
+    """n pair terbanyak; count sama -> pair yang pesan terbarunya lebih baru duluan"""
+    return tuple(heapq.nsmallest(
+        n, _stats['pairs'].items(), key=lambda item: (-item[1], -_pair_newest[item[0]])
+    ))
+
+# ==================== SHARING CACHE ANTAR WORKER ====================
+def _claim_whale_owner():
+    """Coba ambil file lock non-blocking - yang dapat jadi owner Telegram di host ini"""
+    global _owner_lock_fd
+    
+    fd = os.open(WHALE_LOCK_FILE, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    
+    _owner_lock_fd = fd
+    return True
+
+def publish_whale_cache():
+    """Owner: tulis snapshot cache ke file supaya worker lain bisa baca"""
+    if _whale_role != 'owner':
+        return
+    
+    try:
+        payload = {
+            'messages': _whale_view[0],
+            'connected': telegram_client is not None,
+            'last_update': last_update_time.isoformat() if last_update_time else None
+        }
+        # Tulis ke file sementara lalu rename (atomic) supaya reader tidak baca file setengah jadi
+        tmp_path = f"{WHALE_SHARED_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(payload))
+        os.replace(tmp_path, WHALE_SHARED_FILE)
+    except Exception as e:
+        print(f"⚠️ Publish whale cache failed: {e}")
+
+def sync_whale_cache():
+    """Reader: muat ulang cache dari snapshot owner kalau file-nya berubah"""
+    if _whale_role != 'reader':
+        return
+    
+    _load_shared_cache()
+    _try_take_over_owner()
+
+def _load_shared_cache():
+    """Isi sync_whale_cache - baca file snapshot owner kalau mtime-nya berubah"""
+    global _shared_mtime, last_update_time, _owner_connected
+    
+    try:
+        mtime = os.stat(WHALE_SHARED_FILE).st_mtime
+        if mtime == _shared_mtime:
+            return
+        with open(WHALE_SHARED_FILE, 'rb') as f:
+            payload = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return
+    
+    with _cache_lock:
+        _reset_cache_locked()
+        _add_whale_messages_locked(payload['messages'])
+        _shared_mtime = mtime
+    last_update_time = datetime.fromisoformat(payload['last_update']) if payload['last_update'] else None
+    _owner_connected = payload['connected']
+
+def _try_take_over_owner():
+    """
+    Reader: coba ambil lock owner (paling sering tiap WHALE_OWNER_RETRY detik).
+    Berhasil = owner lama sudah exit -> jadi owner, Telegram + scheduler jalan di worker ini.
+    """
+    global _whale_role, _next_owner_try
+    
+    if not _takeover_lock.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if _whale_role != 'reader' or now < _next_owner_try:
+            return
+        _next_owner_try = now + WHALE_OWNER_RETRY
+        if not _claim_whale_owner():
+            return
+        
+        # Id pesan yang sudah ada di cache (dari snapshot terakhir) jangan di-fetch ulang
+        for msg in reversed(_whale_view[0]):
+            if 'id' in msg:
+                mark_message_seen(msg['id'])
+        _whale_role = 'owner'
+    finally:
+        _takeover_lock.release()
+    
+    print(f"🔁 Worker {os.getpid()} took over Telegram (previous owner gone)")
+    # Connect Telegram di thread terpisah supaya request yang memicu sync tidak ikut menunggu
+    threading.Thread(target=_start_telegram_owner, name="whale-owner", daemon=True).start()
+
+def telegram_connected():
+    """Telegram aktif di worker ini, atau di worker owner kalau ini reader"""
+    return _owner_connected if _whale_role == 'reader' else telegram_client is not None
 
-def parse_whale_message(text, date):
-    """Parse format pesan whale"""
+def mark_message_seen(msg_id):
+    """Catat id pesan Telegram, return False kalau sudah pernah diproses"""
+    if msg_id in _seen_msg_ids:
+        return False
+    
+    _seen_msg_ids[msg_id] = None
+    if len(_seen_msg_ids) > _SEEN_MSG_IDS_MAX:
+        _seen_msg_ids.popitem(last=False)
+    return True
+
+def parse_telegram_message(msg):
+    """Filter cepat pakai substring sebelum parse (dipakai polling & push handler)"""
+    text = msg.text
+    if not text:
+        return None
+    
+    # Substring check sekalian menentukan type - pesan tanpa LONG/SHORT tidak bisa diparse
+    mtype = 'LONG' if 'LONG' in text else ('SHORT' if 'SHORT' in text else None)
+    if not mtype:
+        return None
+    
+    return parse_whale_message(text, msg.date, msg.id, mtype)
+
+def parse_whale_message(text, date, msg_id, mtype):
+    """Parse format pesan whale (msg_id = id pesan Telegram, mtype = 'LONG'/'SHORT' dari caller)"""
     try:
-        # Extract pair
-        pair_match = re.search(r'#(\w+)', text)
-        # Extract type (LONG/SHORT)
-        type_match = re.search(r'(LONG|SHORT)', text)
-        # Extract volume
-        volume_match = re.search(r'(?:Short|Long) Volume\s*:\s*\$(\d+k?)\s*\(%([\d.]+)\)', text)
-        # Extract price
-        price_match = re.search(r'Price\s*:\s*([\d.]+)', text)
-        # Extract sequence
-        seq_match = re.search(r'Sequence\s*:\s*(\d+)', text)
+        if not mtype:
+            return None
         
-        if not pair_match or not type_match:
+        # Extract pair, volume, price, sequence dalam satu scan
+        m = _RE_WHALE.search(text)
+        if not m:
             return None
         
         # Hitung confidence dari emoji
-        confidence = len(re.findall(r'[🔴🟢]', text))
+        confidence = len(_RE_CONF.findall(text))
         
         # Format price dengan benar
-        price_val = float(price_match.group(1)) if price_match else 0
+        price_val = float(m.group('price')) if m.group('price') else 0
         if price_val > 1000:
             display_price = f"${price_val:,.2f}"
         elif price_val > 1:
@@ -124,15 +422,15 @@ def parse_whale_message(text, date):
             display_price = f"${price_val:.6f}"
         
         return {
-            'id': abs(hash(text + str(date))) % (10**8),  # ID unik
-            'pair': pair_match.group(1),
-            'type': type_match.group(0),
-            'volume': volume_match.group(1) if volume_match else 'N/A',
-            'volume_percent': volume_match.group(2) if volume_match else 'N/A',
+            'id': msg_id,  # ID pesan Telegram, sudah unik per channel
+            'pair': m.group('pair'),
+            'type': mtype,
+            'volume': m.group('vol') or 'N/A',
+            'volume_percent': m.group('volp') or 'N/A',
             'price': price_val,
-            'sequence': int(seq_match.group(1)) if seq_match else 0,
+            'sequence': int(m.group('seq')) if m.group('seq') else 0,
             'confidence': confidence,
-            'timestamp': date.isoformat() if date else datetime.now().isoformat(),
+            'timestamp': date.isoformat() if date else _now_iso(),
             'display_price': display_price,
             'raw': text[:100] + '...' if len(text) > 100 else text
         }
@@ -140,37 +438,41 @@ def parse_whale_message(text, date):
         print(f"Parse error: {e}")
         return None
 
-def run_async_fetch():
-    """Wrapper untuk menjalankan async function"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(fetch_whale_messages(30))
-    except Exception as e:
-        print(f"⚠️ Scheduled fetch error: {e}")
-    finally:
-        loop.close()
+# ==================== EVENT LOOP BACKGROUND ====================
+# Satu event loop long-lived di thread sendiri. Telethon client terikat ke loop
+# yang men-start-nya, jadi semua coroutine Telegram harus jalan di loop ini.
+_bg_loop = asyncio.new_event_loop()
+threading.Thread(target=_bg_loop.run_forever, name="telegram-loop", daemon=True).start()
+
+def run_on_bg_loop(coro):
+    """Jalankan coroutine di loop background dan tunggu hasilnya"""
+    return asyncio.run_coroutine_threadsafe(coro, _bg_loop).result()
 
 # ==================== SCHEDULER UNTUK UPDATE OTOMATIS ====================
-try:
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(func=run_async_fetch, trigger="interval", minutes=5)  # Update setiap 5 menit
-    scheduler.start()
-    print("✅ Scheduler started - will update every 5 minutes")
-    
-    # Shutdown scheduler saat app stop
-    atexit.register(lambda: scheduler.shutdown())
-except Exception as e:
-    print(f"⚠️ Scheduler init failed: {e}")
+def start_scheduler():
+    """Start safety-net polling (hanya di worker yang pegang Telegram)"""
+    try:
+        # Scheduler jalan native di loop background yang sama dengan Telethon
+        scheduler = AsyncIOScheduler(event_loop=_bg_loop)
+        # Update utama lewat events.NewMessage; polling ini cuma safety-net untuk event yang terlewat
+        scheduler.add_job(fetch_whale_messages, 'interval', hours=1, args=[30])
+        _bg_loop.call_soon_threadsafe(scheduler.start)
+        print("✅ Scheduler started - safety-net fetch every hour")
+        
+        # Shutdown scheduler saat app stop
+        atexit.register(lambda: _bg_loop.call_soon_threadsafe(scheduler.shutdown, False))
+    except Exception as e:
+        print(f"⚠️ Scheduler init failed: {e}")
 
 # ==================== ROUTES YANG SUDAH ADA ====================
 @app.route('/')
 def home():
-    return jsonify({
+    sync_whale_cache()
+    return ojsonify({
         "name": "DylPredict - Liquidation Hunter API",
         "version": "V14 - Conflict Resolution Engine + Whale Alerts",
         "status": "online",
-        "telegram": "connected" if telegram_client else "disconnected (set API_ID & API_HASH)",
+        "telegram": "connected" if telegram_connected() else "disconnected (set API_ID & API_HASH)",
         "endpoints": {
             "/analyze/<symbol>": "Analyze specific symbol",
             "/analyze": "Analyze all popular symbols",
@@ -183,64 +485,103 @@ def home():
 
 @app.route('/health')
 def health():
-    return jsonify({
+    sync_whale_cache()
+    return ojsonify({
         "status": "healthy", 
-        "timestamp": datetime.now().isoformat(),
-        "telegram": "connected" if telegram_client else "disconnected",
-        "whale_messages": len(whale_messages_cache),
+        "timestamp": _now_iso(),
+        "telegram": "connected" if telegram_connected() else "disconnected",
+        "whale_messages": len(_whale_view[0]),
         "last_update": last_update_time.isoformat() if last_update_time else None
     })
 
+def _cached_analyze(symbol):
+    """
+    analyze_symbol dengan TTL cache.
+    Kalau symbol yang sama sedang dihitung thread lain, tunggu hasilnya
+    (single-flight) daripada hit Binance dua kali.
+    """
+    with _ANALYZE_LOCK:
+        hit = _ANALYZE_CACHE.get(symbol)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        future = _ANALYZE_INFLIGHT.get(symbol)
+        owner = future is None
+        if owner:
+            future = _ANALYZE_INFLIGHT[symbol] = concurrent.futures.Future()
+    
+    if not owner:
+        return future.result()
+    
+    try:
+        result = analyze_symbol(symbol)
+    except Exception as e:
+        with _ANALYZE_LOCK:
+            del _ANALYZE_INFLIGHT[symbol]
+        future.set_exception(e)
+        raise
+    
+    with _ANALYZE_LOCK:
+        # Hanya hasil sukses yang di-cache
+        if result:
+            _ANALYZE_CACHE.pop(symbol, None)
+            if len(_ANALYZE_CACHE) >= _ANALYZE_CACHE_MAX:
+                _ANALYZE_CACHE.pop(next(iter(_ANALYZE_CACHE)))
+            _ANALYZE_CACHE[symbol] = (time.monotonic() + _ANALYZE_TTL, result)
+        del _ANALYZE_INFLIGHT[symbol]
+    future.set_result(result)
+    return result
+
 @app.route('/analyze/<symbol>')
 def analyze_single(symbol):
     """Analyze a single cryptocurrency symbol"""
     try:
         symbol = symbol.upper()
-        result = analyze_symbol(symbol)
+        result = _cached_analyze(symbol)
         
         if result:
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "data": result,
                 "symbol": symbol
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "success": False,
                 "error": f"Failed to fetch data for {symbol}",
                 "symbol": symbol
-            }), 400
+            }, 400)
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e),
             "symbol": symbol
-        }), 500
+        }, 500)
+
+def _safe_analyze(symbol):
+    """analyze_symbol (lewat cache) yang tidak raise, untuk dijalankan di thread pool"""
+    try:
+        return _cached_analyze(symbol)
+    except Exception as e:
+        print(f"Error analyzing {symbol}: {e}")
+        return None
 
 @app.route('/analyze')
 def analyze_all():
     """Analyze all popular symbols"""
-    results = []
+    # Semua symbol dianalisa paralel, urutan hasil tetap sama dengan POPULAR_SYMBOLS
+    results = [r for r in _ANALYZE_POOL.map(_safe_analyze, POPULAR_SYMBOLS) if r]
     
-    for symbol in POPULAR_SYMBOLS:
-        try:
-            result = analyze_symbol(symbol)
-            if result:
-                results.append(result)
-        except Exception as e:
-            print(f"Error analyzing {symbol}: {e}")
-    
-    return jsonify({
+    return ojsonify({
         "success": True,
         "count": len(results),
         "data": results,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": _now_iso()
     })
 
 @app.route('/symbols')
 def get_symbols():
     """Get list of popular symbols"""
-    return jsonify({
+    return ojsonify({
         "success": True,
         "symbols": POPULAR_SYMBOLS
     })
@@ -249,24 +590,23 @@ def get_symbols():
 @app.route('/whale-alerts')
 def get_whale_alerts():
     """Endpoint untuk mengambil whale alerts"""
-    global whale_messages_cache
+    sync_whale_cache()
     
     # Parameter opsional
-    limit = request.args.get('limit', default=20, type=int)
+    limit = max(request.args.get('limit', default=20, type=int), 0)
     
     # Filter berdasarkan pair jika ada
     pair = request.args.get('pair', default=None, type=str.upper)
     
-    if pair:
-        filtered = [msg for msg in whale_messages_cache if msg['pair'] == pair]
-        data = filtered[:limit]
-    else:
-        data = whale_messages_cache[:limit]
+    # Ambil snapshot sekali di awal - tanpa lock, slice cukup `limit` item
+    snap, pair_view, _ = _whale_view
+    source = pair_view.get(pair, ()) if pair else snap
+    data = source[:limit]
     
-    return jsonify({
+    return ojsonify({
         "success": True,
         "count": len(data),
-        "total": len(whale_messages_cache),
+        "total": len(snap),
         "data": data,
         "last_update": last_update_time.isoformat() if last_update_time else None,
         "source": "Telegram Channel @BinanceWhaleVolumeAlerts"
@@ -275,35 +615,31 @@ def get_whale_alerts():
 @app.route('/whale-alerts/latest')
 def get_latest_whale():
     """Endpoint untuk mengambil alert terbaru"""
-    if whale_messages_cache:
-        return jsonify({
+    sync_whale_cache()
+    snap = _whale_view[0]
+    if snap:
+        return ojsonify({
             "success": True,
-            "data": whale_messages_cache[0]
+            "data": snap[0]
         })
-    return jsonify({
+    return ojsonify({
         "success": False,
         "error": "No whale alerts yet"
-    }), 404
+    }, 404)
 
 @app.route('/whale-alerts/stats')
 def get_whale_stats():
     """Statistik whale alerts"""
-    if not whale_messages_cache:
-        return jsonify({"success": True, "data": {}})
-    
-    # Hitung statistik
-    total = len(whale_messages_cache)
-    long_count = sum(1 for msg in whale_messages_cache if msg['type'] == 'LONG')
-    short_count = sum(1 for msg in whale_messages_cache if msg['type'] == 'SHORT')
-    
-    # Pair terpopuler
-    pairs = {}
-    for msg in whale_messages_cache:
-        pairs[msg['pair']] = pairs.get(msg['pair'], 0) + 1
+    sync_whale_cache()
+    snap, _, stats_view = _whale_view
+    if not snap:
+        return ojsonify({"success": True, "data": {}})
     
-    top_pairs = sorted(pairs.items(), key=lambda x: x[1], reverse=True)[:5]
+    # Counter sudah dihitung saat insert - cukup baca snapshot-nya
+    total = len(snap)
+    long_count, short_count, top_pairs = stats_view
     
-    return jsonify({
+    return ojsonify({
         "success": True,
         "data": {
             "total_messages": total,
@@ -327,7 +663,7 @@ def get_dummy_whale_data():
             'price': 52400.50,
             'display_price': '$52,400.50',
             'confidence': 2,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'timeString': datetime.now().strftime('%H:%M:%S')
         },
         {
@@ -338,7 +674,7 @@ def get_dummy_whale_data():
             'price': 327.02,
             'display_price': '$327.02',
             'confidence': 4,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'timeString': datetime.now().strftime('%H:%M:%S')
         },
         {
@@ -349,50 +685,68 @@ def get_dummy_whale_data():
             'price': 1.5343,
             'display_price': '$1.5343',
             'confidence': 2,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'timeString': datetime.now().strftime('%H:%M:%S')
         }
     ]
 
-# ==================== INITIALIZATION PERTAMA KALI ====================
-@app.before_request
-def initialize_once():
-    """Jalanin sekali saat pertama kali request (menggantikan before_first_request)"""
-    global app_initialized, whale_messages_cache
+# ==================== INITIALIZATION SAAT STARTUP ====================
+def _initialize():
+    """Jalanin sekali per proses saat import (bukan hook per request)"""
+    global app_initialized, _whale_role
     
-    if not app_initialized:
-        print("🚀 First request - initializing Telegram...")
-        
-        # Cek apakah API credentials tersedia
-        if not TELEGRAM_CONFIG['api_id'] or not TELEGRAM_CONFIG['api_hash']:
-            print("⚠️ API_ID/API_HASH not set. Using dummy data for whale alerts.")
-            whale_messages_cache = get_dummy_whale_data()
-            app_initialized = True
+    if app_initialized:
+        return
+    app_initialized = True
+    
+    # Opt-in: data Binance untuk POPULAR_SYMBOLS lewat WebSocket (push), simbol lain tetap REST
+    if os.environ.get('BINANCE_STREAMS') == '1':
+        start_stream_cache(POPULAR_SYMBOLS)
+    
+    print("🚀 Startup - initializing Telegram...")
+    
+    # Cek apakah API credentials tersedia
+    if not TELEGRAM_CONFIG['api_id'] or not TELEGRAM_CONFIG['api_hash']:
+        print("⚠️ API_ID/API_HASH not set. Using dummy data for whale alerts.")
+        add_whale_messages(get_dummy_whale_data())
+        return
+    
+    # Multi-worker: hanya satu worker yang connect ke Telegram, sisanya baca snapshot
+    if fcntl is not None:
+        if _claim_whale_owner():
+            _whale_role = 'owner'
+        else:
+            _whale_role = 'reader'
+            print(f"ℹ️ Worker {os.getpid()} reads whale alerts shared by the Telegram worker")
             return
+    
+    _start_telegram_owner()
+
+def _start_telegram_owner():
+    """Owner: connect Telegram, fetch awal, start scheduler, lalu publish snapshot"""
+    # Inisialisasi Telegram di loop background
+    try:
+        # Inisialisasi koneksi Telegram
+        init_success = run_on_bg_loop(init_telegram())
         
-        # Inisialisasi Telegram
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            # Inisialisasi koneksi Telegram
-            init_success = loop.run_until_complete(init_telegram())
+        if init_success:
+            # Ambil pesan pertama
+            run_on_bg_loop(fetch_whale_messages(30))
+            start_scheduler()
+            print(f"✅ Telegram initialized with {len(_whale_view[0])} messages")
+        elif not _whale_view[0]:
+            # Fallback ke dummy data (owner hasil takeover tetap pakai cache terakhir)
+            print("⚠️ Using dummy data as fallback")
+            add_whale_messages(get_dummy_whale_data())
             
-            if init_success:
-                # Ambil pesan pertama
-                loop.run_until_complete(fetch_whale_messages(30))
-                print(f"✅ Telegram initialized with {len(whale_messages_cache)} messages")
-            else:
-                # Fallback ke dummy data
-                print("⚠️ Using dummy data as fallback")
-                whale_messages_cache = get_dummy_whale_data()
-                
-        except Exception as e:
-            print(f"❌ Initialization error: {e}")
-            whale_messages_cache = get_dummy_whale_data()
-        finally:
-            loop.close()
-        
-        app_initialized = True
+    except Exception as e:
+        print(f"❌ Initialization error: {e}")
+        if not _whale_view[0]:
+            add_whale_messages(get_dummy_whale_data())
+    
+    publish_whale_cache()
+
+_initialize()
 
 # ==================== MAIN ====================
 if __name__ == '__main__':
@@ -7,112 +7,297 @@ FIX BTRUSDT: Strong Bid + Premium Negatif + Breakdown = SHORT (bukan LONG)
 """
 
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import urllib3
 import numpy as np
-from typing import Optional, Dict, Tuple, Any, List
+import orjson
+from typing import Optional, Dict, Tuple, Any, Mapping, List, Sequence, Callable, Union
 import os
 import time
+import logging
+import threading
+import asyncio
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# websockets opsional - hanya dipakai BinanceStreamCache
+try:
+    import websockets
+except ImportError:
+    websockets = None  # type: ignore[assignment]
+
+# Numba opsional - kalau tidak ter-install, kernel numerik jalan sebagai numpy biasa
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args: Any, **kwargs: Any) -> Callable[[Callable], Callable]:  # type: ignore[no-redef]
+        """Fallback no-op untuk @njit(...)"""
+        return lambda f: f
+
+# Error path lewat logging - format string baru dikerjakan kalau record benar-benar di-emit,
+# dan level bisa diatur dari config (logging.getLogger("liquidation_hunter")) tanpa ubah kode
+log = logging.getLogger(__name__)
 
 # Nonaktifkan SSL warning
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # ================= CONFIG =================
 DEFAULT_TIMEOUT = 10
+FETCH_WORKERS = 16  # Thread untuk fetch endpoint Binance secara paralel
+SYMBOL_WORKERS = 12  # Maks simbol yang dianalisa bersamaan di analyze_symbols
+WEIGHT_BACKOFF = 1000  # Stop batch baru kalau X-MBX-USED-WEIGHT-1M sudah lewat angka ini
+WEIGHT_HARD_LIMIT = 1100  # Lewat ini semua fetch langsung fast-fail sampai ganti menit
+BREAKER_THRESHOLD = 2  # Gagal (5xx/timeout) beruntun sebelum endpoint di-skip sementara
+BREAKER_COOLDOWN = 5.0  # Detik endpoint di-skip setelah breaker terbuka (atau sesuai Retry-After)
+# TTL cache response per endpoint (detik) - burst request simbol yang sama cukup 1x hit Binance
+# ticker/24hr juga sumber harga, jadi TTL-nya setara harga (250ms)
+FETCH_TTL = {
+    "/fapi/v1/ticker/24hr": 0.25,
+    "/fapi/v1/depth": 0.5,
+    "/fapi/v1/trades": 0.5,
+    "/fapi/v1/premiumIndex": 1.0,
+    "/fapi/v1/klines": 2.0
+}
+FETCH_CACHE_MAX = 1024
+STREAM_URL = "wss://fstream.binance.com/stream"  # Combined stream futures
+TRADES_WINDOW = 20  # Jumlah trade terakhir untuk buy/sell flow
+TRADES_WINDOW_MASK = (1 << TRADES_WINDOW) - 1
+STREAM_STALE_AFTER = 5.0  # Detik - data stream lebih tua dari ini dianggap basi (fallback REST)
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 # ================= DATA FETCHER =================
+# Pool shared: semua endpoint per simbol di-fetch bareng, latency ~1 RTT bukan 7
+_FETCH_POOL = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="binance-fetch")
+
+# Pool terpisah untuk level simbol - task di sini menunggu task di _FETCH_POOL
+_SYMBOL_POOL = ThreadPoolExecutor(max_workers=SYMBOL_WORKERS, thread_name_prefix="binance-symbol")
+
+# [menit epoch, weight terakhir] dari header X-MBX-USED-WEIGHT-1M
+_USED_WEIGHT = [0, 0]
+
+# Cache WebSocket aktif (lihat start_stream_cache), None = REST saja
+_STREAM_CACHE: Optional["BinanceStreamCache"] = None
+
+_FETCH_CACHE: Dict[tuple, Tuple[float, Any]] = {}  # (endpoint, params) -> (expiry, data)
+_FETCH_INFLIGHT: Dict[tuple, Future] = {}  # (endpoint, params) -> Future milik thread yang sedang fetch
+_FETCH_LOCK = threading.Lock()
+
+
+def _clear_caches() -> None:
+    """Kosongkan cache response (untuk testing / paksa data fresh)"""
+    with _FETCH_LOCK:
+        _FETCH_CACHE.clear()
+
+def _over_weight_budget(limit: int = WEIGHT_BACKOFF) -> bool:
+    """True kalau weight Binance menit ini sudah lewat limit"""
+    minute, weight = _USED_WEIGHT
+    return minute == int(time.time() // 60) and weight > limit
+
+# ================= CIRCUIT BREAKER =================
+# endpoint -> [gagal beruntun, open_until (monotonic)]
+_BREAKER: Dict[str, List[float]] = {}
+_BREAKER_LOCK = threading.Lock()  # Diakses dari semua thread _FETCH_POOL
+
+def _breaker_open(endpoint: str) -> bool:
+    """True kalau endpoint sedang di-skip (fast-fail, tidak hit Binance)"""
+    with _BREAKER_LOCK:
+        state = _BREAKER.get(endpoint)
+        return state is not None and time.monotonic() < state[1]
+
+def _breaker_success(endpoint: str) -> None:
+    with _BREAKER_LOCK:
+        _BREAKER.pop(endpoint, None)
+
+def _breaker_failure(endpoint: str, cooldown: Optional[float] = None) -> None:
+    """
+    Catat kegagalan. cooldown diisi (Retry-After 429/418) -> langsung buka breaker,
+    kalau tidak breaker baru terbuka setelah BREAKER_THRESHOLD gagal beruntun
+    """
+    with _BREAKER_LOCK:
+        state = _BREAKER.setdefault(endpoint, [0, 0.0])
+        state[0] += 1
+        if cooldown is None and state[0] < BREAKER_THRESHOLD:
+            return
+        wait = cooldown if cooldown is not None else BREAKER_COOLDOWN
+        state[1] = time.monotonic() + wait
+    log.warning("🚧 Binance %s paused for %.0fs", endpoint, wait)
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """Header Retry-After (detik atau HTTP-date) -> detik; kosong / tidak valid -> BREAKER_COOLDOWN"""
+    if not value:
+        return BREAKER_COOLDOWN
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return BREAKER_COOLDOWN
+
+def make_session(pool_connections: int = 10, pool_maxsize: int = 10,
+                 max_retries: Any = 0) -> requests.Session:
+    """
+    Buat requests.Session yang sudah dikonfigurasi untuk Binance
+    Share satu session antar panggilan supaya koneksi keep-alive dipakai ulang
+    """
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+    session.verify = False
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Session default per proses - dibuat sekali (lazy), dipakai semua BinanceFetcher
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """Session singleton (double-checked locking) supaya koneksi TLS tidak dibuang tiap analisa"""
+    global _SESSION
+    
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                # Retry sekali untuk error transient (koneksi/5xx) dengan backoff pendek.
+                # respect_retry_after_header=False: kalau True, urllib3 juga me-retry 429 (dan 413/503)
+                # yang punya Retry-After dan tidur selama header itu di thread fetch. 429/418
+                # ditangani circuit breaker di _fetch_remote tanpa request ulang
+                _SESSION = make_session(pool_connections=32, pool_maxsize=32,
+                                        max_retries=Retry(total=1, backoff_factor=0.2,
+                                                          status_forcelist=(500, 502, 503, 504),
+                                                          respect_retry_after_header=False,
+                                                          raise_on_status=False))
+    return _SESSION
+
+
 class BinanceFetcher:
     """Centralized data fetching with error handling - Production Ready"""
     
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, session: Optional[requests.Session] = None) -> None:
         self.symbol = symbol.upper()
         self.BASE_URL = "https://fapi.binance.com"  # Futures API
         self.TIMEOUT = DEFAULT_TIMEOUT
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": USER_AGENT,
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive"
-        })
-        self.session.verify = False
+        # Pakai session dari caller kalau ada, kalau tidak session shared per proses
+        self.session = session if session is not None else _get_session()
+        
+    def fetch(self, endpoint: str, params: Optional[Dict] = None,
+              decode: Callable[[bytes], Any] = orjson.loads) -> Optional[Any]:
+        """
+        Fetch data dari Binance, lewat TTL cache per endpoint (FETCH_TTL).
+        Kalau key yang sama sedang di-fetch thread lain, tunggu hasilnya (single-flight).
+        decode: body bytes -> hasil (default orjson.loads), ikut jadi bagian key cache
+        """
+        ttl = FETCH_TTL.get(endpoint)
+        if not ttl:
+            return self._fetch_remote(endpoint, params, decode)
+        
+        key = (endpoint, tuple(sorted(params.items())) if params else (), decode)
+        with _FETCH_LOCK:
+            hit = _FETCH_CACHE.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+            future = _FETCH_INFLIGHT.get(key)
+            owner = future is None
+            if future is None:
+                future = _FETCH_INFLIGHT[key] = Future()
+        
+        if not owner:
+            return future.result()
         
-    def fetch(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Any]:
+        data = None
+        try:
+            data = self._fetch_remote(endpoint, params, decode)
+        finally:
+            with _FETCH_LOCK:
+                # Hanya response sukses yang di-cache
+                if data is not None:
+                    _FETCH_CACHE.pop(key, None)
+                    if len(_FETCH_CACHE) >= FETCH_CACHE_MAX:
+                        _FETCH_CACHE.pop(next(iter(_FETCH_CACHE)))
+                    _FETCH_CACHE[key] = (time.monotonic() + ttl, data)
+                del _FETCH_INFLIGHT[key]
+            future.set_result(data)
+        return data
+    
+    def _fetch_remote(self, endpoint: str, params: Optional[Dict] = None,
+                      decode: Callable[[bytes], Any] = orjson.loads) -> Optional[Any]:
         """Fetch data dari Binance dengan error handling komprehensif"""
+        # Fast-fail: endpoint lagi bermasalah / kena rate limit, atau weight menit ini hampir habis
+        if _breaker_open(endpoint) or _over_weight_budget(WEIGHT_HARD_LIMIT):
+            return None
+        
         try:
             url = f"{self.BASE_URL}{endpoint}"
             response = self.session.get(url, params=params, timeout=self.TIMEOUT, allow_redirects=True)
-            return response.json() if response.status_code == 200 else None
+            
+            # Catat weight yang sudah terpakai menit ini (dipakai analyze_symbols untuk back off)
+            used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used_weight:
+                _USED_WEIGHT[:] = [int(time.time() // 60), int(used_weight)]
+            
+            status = response.status_code
+            if status == 200:
+                _breaker_success(endpoint)
+                return decode(response.content)
+            if status in (418, 429):
+                # Rate limit / IP ban - berhenti hit endpoint ini selama Retry-After
+                _breaker_failure(endpoint, _retry_after_seconds(response.headers.get("Retry-After")))
+            elif status >= 500:
+                _breaker_failure(endpoint)
+            return None
         except requests.exceptions.Timeout:
-            print(f"⏰ Timeout: {endpoint}")
+            log.warning("⏰ Timeout: %s", endpoint)
+            _breaker_failure(endpoint)
             return None
         except requests.exceptions.ConnectionError:
-            print(f"🔌 Connection Error: {endpoint}")
+            log.warning("🔌 Connection Error: %s", endpoint)
+            _breaker_failure(endpoint)
             return None
         except Exception as e:
-            print(f"❌ Fetch Error {endpoint}: {e}")
+            log.warning("❌ Fetch Error %s: %s", endpoint, e)
             return None
     
-    def get_price(self) -> Optional[float]:
-        """Get current price"""
-        try:
-            data = self.fetch("/fapi/v1/ticker/price", {"symbol": self.symbol})
-            return float(data["price"]) if data and "price" in data else None
-        except:
-            return None
-    
-    def get_24h_change(self) -> Optional[float]:
-        """Get 24h price change percentage"""
-        try:
-            data = self.fetch("/fapi/v1/ticker/24hr", {"symbol": self.symbol})
-            return float(data["priceChangePercent"]) if data and "priceChangePercent" in data else None
-        except:
-            return None
-    
-    def get_orderbook_ratio(self) -> Optional[float]:
+    def get_24h_ticker(self) -> Optional[Dict]:
         """
-        Get bid/ask ratio dari orderbook
-        TRUE interpretation: High ratio = BID dominant = BUY pressure = BULLISH
+        Get harga terakhir + perubahan 24h dari satu call ticker/24hr
+        (lastPrice sama dengan ticker/price, jadi tidak perlu call terpisah)
         """
         try:
-            data = self.fetch("/fapi/v1/depth", {"symbol": self.symbol, "limit": 10})
-            if not data or "bids" not in data or "asks" not in data:
+            data = self.fetch("/fapi/v1/ticker/24hr", {"symbol": self.symbol})
+            if not data:
                 return None
             
-            bid_vol = sum(float(q) for _, q in data["bids"][:5])
-            ask_vol = sum(float(q) for _, q in data["asks"][:5])
-            
-            if ask_vol == 0:
-                return 99.0
-            if bid_vol == 0:
-                return 0.01
-            
-            ratio = round(bid_vol / ask_vol, 2)
-            return min(ratio, 99.0)
-        except Exception as e:
-            print(f"❌ Orderbook error: {e}")
+            return {
+                "price": float(data["lastPrice"]) if "lastPrice" in data else None,
+                "change": float(data["priceChangePercent"]) if "priceChangePercent" in data else None
+            }
+        except:
             return None
     
     def get_trades_flow(self) -> Optional[Dict]:
         """Analyze last 20 trades - buy/sell flow"""
         try:
-            data = self.fetch("/fapi/v1/trades", {"symbol": self.symbol, "limit": 20})
-            if not data:
-                return None
-            
-            buys = sum(1 for trade in data if not trade.get("isBuyerMaker", True))
-            sells = len(data) - buys
-            buy_ratio = buys / sells if sells > 0 else 99.0
-            
-            return {
-                "buys": buys,
-                "sells": sells,
-                "ratio": round(buy_ratio, 2)
-            }
+            # Langsung hitung dari body - tidak perlu parse 20 dict trade
+            return self.fetch("/fapi/v1/trades", {"symbol": self.symbol, "limit": TRADES_WINDOW},
+                              decode=_trades_flow_from_body)
         except Exception as e:
-            print(f"❌ Trades flow error: {e}")
+            log.warning("❌ Trades flow error: %s", e)
             return None
     
     def get_funding_premium(self) -> Optional[Dict]:
@@ -127,22 +312,10 @@ class BinanceFetcher:
             if not data:
                 return None
             
-            mark_price = float(data.get("markPrice", 0))
-            index_price = float(data.get("indexPrice", 0))
-            
-            if index_price == 0:
-                premium_basis = 0
-            else:
-                premium_basis = ((mark_price - index_price) / index_price) * 100
-            
-            return {
-                "mark": mark_price,
-                "index": index_price,
-                "premium": round(premium_basis, 4),
-                "funding": float(data.get("lastFundingRate", 0)) * 100
-            }
+            # Schema premiumIndex stabil - index langsung, field hilang jatuh ke except (None)
+            return _premium_from(data["markPrice"], data["indexPrice"], data["lastFundingRate"])
         except Exception as e:
-            print(f"❌ Funding premium error: {e}")
+            log.warning("❌ Funding premium error: %s", e)
             return None
     
     def get_klines(self, limit: int = 20) -> Optional[Dict]:
@@ -157,19 +330,333 @@ class BinanceFetcher:
             if not data:
                 return None
             
-            return {
-                "highs": [float(k[2]) for k in data if len(k) > 2],
-                "lows": [float(k[3]) for k in data if len(k) > 3],
-                "closes": [float(k[4]) for k in data if len(k) > 4],
-                "volumes": [float(k[5]) for k in data if len(k) > 5]
-            }
+            return _klines_arrays([k[2:6] for k in data])
         except Exception as e:
-            print(f"❌ Klines error: {e}")
+            log.warning("❌ Klines error: %s", e)
             return None
     
-    def get_depth(self) -> Optional[Dict]:
-        """Get orderbook depth"""
-        return self.fetch("/fapi/v1/depth", {"symbol": self.symbol, "limit": 20})
+    def get_depth(self, limit: int = 5) -> Optional[Dict]:
+        """
+        Get orderbook depth
+        Default 5 level - cukup untuk ob ratio (_ratio_from_depth pakai top 5), payload paling kecil
+        """
+        return self.fetch("/fapi/v1/depth", {"symbol": self.symbol, "limit": limit})
+
+
+def _trades_flow(trades: List[Dict]) -> Dict:
+    """Hitung buy/sell flow dari list trade (field isBuyerMaker)"""
+    # list.count jalan di C - lebih cepat dari generator maupun bit-pack per elemen di Python
+    buys = [trade.get("isBuyerMaker", True) for trade in trades].count(False)
+    return _flow_from_counts(buys, len(trades) - buys)
+
+def _trades_flow_from_body(body: bytes) -> Optional[Dict]:
+    """
+    Buy/sell flow langsung dari body JSON /fapi/v1/trades (bytes.count, ~7x lebih cepat dari parse)
+    Binance kirim JSON compact; kalau format beda (tidak ketemu sama sekali) fallback parse penuh
+    """
+    buys = body.count(b'"isBuyerMaker":false')
+    sells = body.count(b'"isBuyerMaker":true')
+    if buys or sells:
+        return _flow_from_counts(buys, sells)
+    
+    trades = orjson.loads(body)
+    return _trades_flow(trades) if trades else None
+
+def _flow_from_counts(buys: int, sells: int) -> Dict:
+    """Dict flow dari jumlah buy/sell"""
+    buy_ratio = buys / sells if sells > 0 else 99.0
+    
+    return {
+        "buys": buys,
+        "sells": sells,
+        "ratio": round(buy_ratio, 2)
+    }
+
+def _premium_from(mark: Any, index: Any, funding_rate: Any) -> Dict:
+    """Premium basis (%) + funding dari mark/index price (string atau float)"""
+    mark_price = float(mark)
+    index_price = float(index)
+    
+    premium_basis = (mark_price - index_price) / index_price * 100 if index_price else 0
+    
+    return {
+        "mark": mark_price,
+        "index": index_price,
+        "premium": round(premium_basis, 4),
+        "funding": float(funding_rate) * 100
+    }
+
+def _klines_arrays(rows: List) -> Dict:
+    """Baris [high, low, close, volume] -> kolom np.ndarray float64"""
+    # Satu pass konversi ke float64, lalu transpose supaya tiap kolom contiguous (dipakai kernel numba)
+    a = np.ascontiguousarray(np.array(rows, dtype=np.float64).T)
+    return {
+        "highs": a[0],
+        "lows": a[1],
+        "closes": a[2],
+        "volumes": a[3]
+    }
+
+def _ratio_from_depth(depth: Optional[Dict]) -> Optional[float]:
+    """
+    Bid/ask ratio dari 5 level teratas depth (tanpa fetch ulang orderbook)
+    TRUE interpretation: High ratio = BID dominant = BUY pressure = BULLISH
+    """
+    try:
+        if not depth or "bids" not in depth or "asks" not in depth:
+            return None
+        
+        # Cuma 5 level: sum Python ~4x lebih cepat dari bikin array numpy dulu
+        # (biaya alokasi array > biaya 10x float()), jadi sengaja tidak di-vectorize
+        bid_vol = sum([float(q) for _, q in depth["bids"][:5]])
+        ask_vol = sum([float(q) for _, q in depth["asks"][:5]])
+        
+        if ask_vol == 0:
+            return 99.0
+        if bid_vol == 0:
+            return 0.01
+        
+        ratio = round(bid_vol / ask_vol, 2)
+        return min(ratio, 99.0)
+    except Exception as e:
+        log.warning("❌ Orderbook error: %s", e)
+        return None
+
+
+# ================= WEBSOCKET STREAM CACHE (OPSIONAL) =================
+class Float64Ring:
+    """Ring buffer baris float64 ukuran tetap - buffer dialokasi sekali, push tanpa alokasi"""
+    __slots__ = ("buf", "pos", "n", "cap")
+    
+    def __init__(self, cap: int, cols: int) -> None:
+        self.buf = np.zeros((cap, cols), dtype=np.float64)
+        self.pos = 0  # Slot yang akan ditulis berikutnya
+        self.n = 0
+        self.cap = cap
+    
+    def push(self, row: Sequence[float]) -> None:
+        self.buf[self.pos] = row
+        self.pos = (self.pos + 1) % self.cap
+        self.n = min(self.n + 1, self.cap)
+    
+    def last(self) -> np.ndarray:
+        """View baris terbaru (bisa ditimpa in-place)"""
+        return self.buf[self.pos - 1]
+    
+    def clear(self) -> None:
+        self.pos = self.n = 0
+    
+    def tail(self, k: int) -> np.ndarray:
+        """Salinan k baris terakhir, urut lama -> baru"""
+        k = min(k, self.n)
+        idx = (np.arange(self.pos - k, self.pos)) % self.cap
+        return self.buf[idx]
+
+
+class BinanceStreamCache:
+    """
+    Data market live dari WebSocket Binance (push, bukan polling REST)
+    Satu koneksi combined stream untuk semua simbol, jalan di thread + event loop sendiri.
+    analyze_symbol pakai data ini kalau semua bagian ada dan masih fresh, kalau tidak fallback ke REST.
+    """
+    
+    def __init__(self, symbols: Sequence[str], stale_after: float = STREAM_STALE_AFTER) -> None:
+        self.symbols = [s.upper() for s in symbols]
+        self.stale_after = stale_after
+        # symbol -> {bagian: (monotonic_ts, value)} - value diganti utuh, reader tidak perlu lock
+        self._state: Dict[str, Dict[str, Tuple[float, Any]]] = {s: {} for s in self.symbols}
+        # Window 20 trade terakhir di-pack jadi bit (1 = buyer maker / sell), dihitung pakai popcount
+        self._maker_bits = {s: 0 for s in self.symbols}
+        self._trade_count = {s: 0 for s in self.symbols}
+        self._klines = {s: Float64Ring(20, 5) for s in self.symbols}  # [open_time, h, l, c, v]
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "BinanceStreamCache":
+        """Start receive loop di daemon thread"""
+        if self._thread is None:
+            thread = threading.Thread(target=lambda: asyncio.run(self._run()),
+                                      daemon=True, name="binance-stream")
+            thread.start()
+            self._thread = thread
+        return self
+    
+    def get(self, symbol: str) -> Optional[Tuple[Dict, Dict, Dict, Dict, Dict]]:
+        """(ticker, depth, trades, premium, klines) dengan bentuk sama seperti getter REST, atau None"""
+        state = self._state.get(symbol.upper())
+        if not state:
+            return None
+        
+        now = time.monotonic()
+        parts = []
+        for part in ("ticker", "depth", "trades", "premium", "klines"):
+            entry = state.get(part)
+            if entry is None or now - entry[0] > self.stale_after:
+                return None
+            parts.append(entry[1])
+        
+        # Klines sudah dalam bentuk kolom float64 (dibangun di sisi writer)
+        return tuple(parts)
+    
+    async def _run(self) -> None:
+        """Connect + receive loop, reconnect dengan backoff kalau putus"""
+        streams = "/".join(
+            f"{s.lower()}@{name}" for s in self.symbols
+            for name in ("ticker", "depth5@100ms", "aggTrade", "markPrice@1s", "kline_1m")
+        )
+        backoff = 1
+        while True:
+            try:
+                async with websockets.connect(f"{STREAM_URL}?streams={streams}", ping_interval=20) as ws:
+                    log.info("✅ Binance stream connected (%d symbols)", len(self.symbols))
+                    backoff = 1
+                    # Seed klines lewat REST sekali, selanjutnya di-update dari stream kline
+                    await asyncio.get_running_loop().run_in_executor(None, self._seed_klines)
+                    async for raw in ws:
+                        self._on_message(orjson.loads(raw))
+            except Exception as e:
+                log.warning("🔌 Binance stream error: %s - reconnect in %ss", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+    
+    def _seed_klines(self) -> None:
+        """Isi ring klines 20 candle terakhir dari REST"""
+        for symbol in self.symbols:
+            data = BinanceFetcher(symbol).fetch("/fapi/v1/klines", {"symbol": symbol, "interval": "1m", "limit": 20})
+            if data:
+                ring = self._klines[symbol]
+                ring.clear()
+                for k in data:
+                    ring.push([float(k[0])] + [float(v) for v in k[2:6]])
+                self._publish_klines(symbol)
+    
+    def _publish_klines(self, symbol: str) -> None:
+        """Publish kolom klines (high, low, close, volume) dari ring - reader dapat array siap pakai"""
+        cols = np.ascontiguousarray(self._klines[symbol].tail(20)[:, 1:].T)
+        self._state[symbol]["klines"] = (time.monotonic(), {
+            "highs": cols[0],
+            "lows": cols[1],
+            "closes": cols[2],
+            "volumes": cols[3]
+        })
+    
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        """Update state satu simbol dari satu pesan combined stream"""
+        data = msg.get("data") or {}
+        symbol = data.get("s")
+        if symbol is None:
+            return
+        state = self._state.get(symbol)
+        if state is None:
+            return
+        
+        now = time.monotonic()
+        event = data.get("e")
+        if event == "24hrTicker":
+            state["ticker"] = (now, {"price": float(data["c"]), "change": float(data["P"])})
+        elif event == "depthUpdate":
+            state["depth"] = (now, {"bids": data["b"], "asks": data["a"]})
+        elif event == "aggTrade":
+            bits = self._maker_bits[symbol] = ((self._maker_bits[symbol] << 1) | data["m"]) & TRADES_WINDOW_MASK
+            n = self._trade_count[symbol] = min(self._trade_count[symbol] + 1, TRADES_WINDOW)
+            sells = bits.bit_count()
+            state["trades"] = (now, _flow_from_counts(n - sells, sells))
+        elif event == "markPriceUpdate":
+            state["premium"] = (now, _premium_from(data["p"], data["i"], data["r"]))
+        elif event == "kline":
+            k = data["k"]
+            ring = self._klines[symbol]
+            if not ring.n:
+                return  # Belum di-seed
+            row = (float(k["t"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+            last = ring.last()
+            if last[0] == row[0]:
+                last[:] = row  # Candle berjalan di-update in-place
+            elif row[0] > last[0]:
+                ring.push(row)  # Candle baru, yang paling lama tertimpa
+            else:
+                return
+            self._publish_klines(symbol)
+
+
+def start_stream_cache(symbols: Sequence[str]) -> Optional[BinanceStreamCache]:
+    """Aktifkan data WebSocket untuk analyze_symbol (opt-in, butuh package websockets)"""
+    global _STREAM_CACHE
+    
+    if websockets is None:
+        log.warning("⚠️ websockets not installed - Binance streams disabled, using REST")
+        return None
+    if _STREAM_CACHE is None:
+        _STREAM_CACHE = BinanceStreamCache(symbols).start()
+    return _STREAM_CACHE
+
+
+# ================= NUMERIC KERNELS =================
+# Reduksi kecil (10-20 elemen) - di-JIT kalau numba ada, kalau tidak tetap numpy
+TREND_NAMES = {1: "UP", -1: "DOWN", 0: "FLAT"}
+
+@njit(cache=True)
+def _ema_trend_kernel(closes: np.ndarray, threshold: float) -> Tuple[float, int]:
+    """Return (slope, code) - code 1=UP, -1=DOWN, 0=FLAT"""
+    n = len(closes)
+    if n < 10:
+        return 0.0, 0
+    
+    ema_short = closes[n - 5:].mean()
+    ema_long = closes[n - 10:].mean()
+    if ema_long == 0:
+        return 0.0, 0
+    
+    slope = (ema_short - ema_long) / ema_long
+    if slope > threshold:
+        return slope, 1
+    elif slope < -threshold:
+        return slope, -1
+    return slope, 0
+
+@njit(cache=True)
+def _price_changes_kernel(closes: np.ndarray) -> Tuple[float, float, float]:
+    """Return (change_1m, change_5m, change_15m) dalam persen"""
+    n = len(closes)
+    c1 = c5 = c15 = 0.0
+    if n >= 2 and closes[n - 2] != 0:
+        c1 = ((closes[n - 1] - closes[n - 2]) / closes[n - 2]) * 100
+    if n >= 5 and closes[n - 5] != 0:
+        c5 = ((closes[n - 1] - closes[n - 5]) / closes[n - 5]) * 100
+    if n >= 15 and closes[n - 15] != 0:
+        c15 = ((closes[n - 1] - closes[n - 15]) / closes[n - 15]) * 100
+    return c1, c5, c15
+
+@njit(cache=True)
+def _liq_zones_kernel(highs: np.ndarray, lows: np.ndarray, current_price: float) -> Tuple[float, float, float, float]:
+    """Return (recent_high, recent_low, long_liq_distance, short_liq_distance) - 10 candle terakhir"""
+    recent_high = highs[max(len(highs) - 10, 0):].max()
+    recent_low = lows[max(len(lows) - 10, 0):].min()
+    
+    long_liq_distance = ((current_price - recent_low) / recent_low) * 100 if recent_low != 0 else 0.0
+    short_liq_distance = ((recent_high - current_price) / current_price) * 100 if current_price != 0 else 0.0
+    return recent_high, recent_low, long_liq_distance, short_liq_distance
+
+@njit(cache=True)
+def _reversal_batch_kernel(c24: np.ndarray, bd: np.ndarray, nlq: np.ndarray, nsq: np.ndarray,
+                           prem: np.ndarray, ob: np.ndarray, pb: np.ndarray, chg5: np.ndarray,
+                           out: np.ndarray) -> None:
+    """
+    Isi out (N, 8) bool per baris dalam satu pass - tanpa array sementara per kondisi
+    Pakai & / | (bukan and/or) supaya branchless - short-circuit justru lebih lambat di data acak
+    Hanya dipakai kalau numba ada (loop Python biasa jauh lebih lambat dari versi numpy)
+    """
+    for i in range(len(c24)):
+        c, p, o, q, g = c24[i], prem[i], ob[i], pb[i], chg5[i]
+        b, l, s = bd[i], nlq[i], nsq[i]
+        nb = not b
+        out[i, 0] = (c > 30) & b & l & (p < -0.2)
+        out[i, 1] = (c < -20) & nb & s & (p > 0.2)
+        out[i, 2] = (o == 2) & (q < 0) & (g < 0) & (b | l)
+        out[i, 3] = (o == -2) & (q > 0) & (g > 0) & (nb | s)
+        out[i, 4] = (o > 0) & (q < 0)
+        out[i, 5] = (o < 0) & (q > 0)
+        out[i, 6] = (c > 50) & b & l & (p < -0.5)
+        out[i, 7] = (c < -40) & nb & s & (p > 0.5)
 
 
 # ================= ANALYZERS =================
@@ -177,56 +664,33 @@ class TechnicalAnalyzer:
     """Technical analysis with threshold-based filtering"""
     
     @staticmethod
-    def get_ema_trend(closes: List[float], threshold: float = 0.0005) -> Tuple[float, str]:
+    def get_ema_trend(closes: np.ndarray, threshold: float = 0.0005) -> Tuple[float, str]:
         """EMA dengan THRESHOLD - noise elimination"""
         try:
-            if len(closes) < 10:
-                return 0, "FLAT"
-            
-            ema_short = float(np.mean(closes[-5:]))
-            ema_long = float(np.mean(closes[-10:]))
-            
-            if ema_long == 0:
-                return 0, "FLAT"
-                
-            slope = (ema_short - ema_long) / ema_long
-            
-            if slope > threshold:
-                return slope, "UP"
-            elif slope < -threshold:
-                return slope, "DOWN"
-            return slope, "FLAT"
+            slope, code = _ema_trend_kernel(closes, threshold)
+            return float(slope), TREND_NAMES[code]
         except:
             return 0, "FLAT"
     
     @staticmethod
-    def get_price_changes(closes: List[float]) -> Dict:
+    def get_price_changes(closes: np.ndarray) -> Dict:
         """Calculate price changes for different timeframes"""
-        changes = {"1m": 0.0, "5m": 0.0, "15m": 0.0}
-        
         try:
-            if len(closes) >= 2 and closes[-2] != 0:
-                changes["1m"] = ((closes[-1] - closes[-2]) / closes[-2]) * 100
-            if len(closes) >= 5 and closes[-5] != 0:
-                changes["5m"] = ((closes[-1] - closes[-5]) / closes[-5]) * 100
-            if len(closes) >= 15 and closes[-15] != 0:
-                changes["15m"] = ((closes[-1] - closes[-15]) / closes[-15]) * 100
+            c1, c5, c15 = _price_changes_kernel(closes)
+            return {"1m": float(c1), "5m": float(c5), "15m": float(c15)}
         except:
-            pass
-        return changes
+            return {"1m": 0.0, "5m": 0.0, "15m": 0.0}
     
     @staticmethod
-    def get_liquidation_zones(highs: List[float], lows: List[float], current_price: float) -> Dict:
+    def get_liquidation_zones(highs: np.ndarray, lows: np.ndarray, current_price: float) -> Dict:
         """Deteksi zona likuidasi"""
         try:
-            if not highs or not lows or current_price == 0:
+            if len(highs) == 0 or len(lows) == 0 or current_price == 0:
                 return {"near_long_liq": False, "near_short_liq": False, "recent_high": 0, "recent_low": 0, "long_liq_distance": 0, "short_liq_distance": 0}
             
-            recent_high = max(highs[-10:]) if len(highs) >= 10 else max(highs)
-            recent_low = min(lows[-10:]) if len(lows) >= 10 else min(lows)
-            
-            long_liq_distance = ((current_price - recent_low) / recent_low) * 100 if recent_low != 0 else 0
-            short_liq_distance = ((recent_high - current_price) / current_price) * 100 if current_price != 0 else 0
+            recent_high, recent_low, long_liq_distance, short_liq_distance = (
+                float(v) for v in _liq_zones_kernel(highs, lows, float(current_price))
+            )
             
             return {
                 "near_long_liq": current_price <= recent_low * 1.02,
@@ -241,36 +705,63 @@ class TechnicalAnalyzer:
 
 
 # ================= MARKET STRUCTURE ANALYZER =================
+# Bit per pattern di detect_reversal_patterns()["mask"]
+PATTERN_OVERBOUGHT_REVERSAL = 1 << 0
+PATTERN_OVERSOLD_REVERSAL = 1 << 1
+PATTERN_BID_LIQUIDITY_TRAP = 1 << 2
+PATTERN_ASK_LIQUIDITY_TRAP = 1 << 3
+PATTERN_BID_VS_PREMIUM_CONFLICT = 1 << 4
+PATTERN_ASK_VS_PREMIUM_CONFLICT = 1 << 5
+PATTERN_EXTREME_OVERBOUGHT_CASCADE = 1 << 6
+PATTERN_EXTREME_OVERSOLD_CASCADE = 1 << 7
+
+# Kode int8 bias untuk versi vektor (detect_reversal_patterns_batch) - tanda = arah, 2 = dominan
+OB_BIAS_CODES = MappingProxyType({"STRONG_BID": 2, "BID": 1, "NEUTRAL": 0, "ASK": -1, "STRONG_ASK": -2})
+PREMIUM_BIAS_CODES = MappingProxyType({"LONG_DOMINANT": 2, "LONG_BIAS": 1, "NEUTRAL": 0, "SHORT_BIAS": -1, "SHORT_DOMINANT": -2})
+
+# Output sentiment cuma 5 kemungkinan masing-masing - pakai object yang sama (read-only)
+OB_STRONG_BID = MappingProxyType({"bias": "STRONG_BID", "sentiment": "BULLISH", "score": 40})
+OB_BID = MappingProxyType({"bias": "BID", "sentiment": "BULLISH_BIAS", "score": 20})
+OB_NEUTRAL = MappingProxyType({"bias": "NEUTRAL", "sentiment": "NEUTRAL", "score": 0})
+OB_ASK = MappingProxyType({"bias": "ASK", "sentiment": "BEARISH_BIAS", "score": -20})
+OB_STRONG_ASK = MappingProxyType({"bias": "STRONG_ASK", "sentiment": "BEARISH", "score": -40})
+
+PREMIUM_LONG_DOMINANT = MappingProxyType({"bias": "LONG_DOMINANT", "risk": "SHORT_SQUEEZE", "score": 30})
+PREMIUM_LONG_BIAS = MappingProxyType({"bias": "LONG_BIAS", "risk": "POTENTIAL_SQUEEZE", "score": 15})
+PREMIUM_NEUTRAL = MappingProxyType({"bias": "NEUTRAL", "risk": "NO_SQUEEZE", "score": 0})
+PREMIUM_SHORT_BIAS = MappingProxyType({"bias": "SHORT_BIAS", "risk": "POTENTIAL_LIQUIDATION", "score": -15})
+PREMIUM_SHORT_DOMINANT = MappingProxyType({"bias": "SHORT_DOMINANT", "risk": "LONG_SQUEEZE", "score": -30})
+
 class MarketStructureAnalyzer:
     """Market structure and pattern recognition"""
     
     @staticmethod
-    def get_orderbook_sentiment(ratio: float) -> Dict:
-        """FIX #1: Interpretasi orderbook yang BENAR"""
+    def get_orderbook_sentiment(ratio: float) -> Mapping:
+        """FIX #1: Interpretasi orderbook yang BENAR (return konstanta read-only)"""
         if ratio > 2.0:
-            return {"bias": "STRONG_BID", "sentiment": "BULLISH", "score": 40}
+            return OB_STRONG_BID
         elif ratio > 1.2:
-            return {"bias": "BID", "sentiment": "BULLISH_BIAS", "score": 20}
+            return OB_BID
         elif ratio < 0.5:
-            return {"bias": "STRONG_ASK", "sentiment": "BEARISH", "score": -40}
+            return OB_STRONG_ASK
         elif ratio < 0.8:
-            return {"bias": "ASK", "sentiment": "BEARISH_BIAS", "score": -20}
+            return OB_ASK
         else:
-            return {"bias": "NEUTRAL", "sentiment": "NEUTRAL", "score": 0}
+            return OB_NEUTRAL
     
     @staticmethod
-    def get_premium_sentiment(premium: float) -> Dict:
-        """FIX #2: Interpretasi premium yang BENAR"""
+    def get_premium_sentiment(premium: float) -> Mapping:
+        """FIX #2: Interpretasi premium yang BENAR (return konstanta read-only)"""
         if premium > 0.1:
-            return {"bias": "LONG_DOMINANT", "risk": "SHORT_SQUEEZE", "score": 30}
+            return PREMIUM_LONG_DOMINANT
         elif premium > 0.03:
-            return {"bias": "LONG_BIAS", "risk": "POTENTIAL_SQUEEZE", "score": 15}
+            return PREMIUM_LONG_BIAS
         elif premium < -0.1:
-            return {"bias": "SHORT_DOMINANT", "risk": "LONG_SQUEEZE", "score": -30}
+            return PREMIUM_SHORT_DOMINANT
         elif premium < -0.03:
-            return {"bias": "SHORT_BIAS", "risk": "POTENTIAL_LIQUIDATION", "score": -15}
+            return PREMIUM_SHORT_BIAS
         else:
-            return {"bias": "NEUTRAL", "risk": "NO_SQUEEZE", "score": 0}
+            return PREMIUM_NEUTRAL
     
     @staticmethod
     def detect_squeeze_setups(trades: Dict, premium: float, change_5m: float) -> Dict:
@@ -327,68 +818,52 @@ class MarketStructureAnalyzer:
                                 near_long_liq: bool, near_short_liq: bool,
                                 premium: float, ob_bias: str, premium_bias: str,
                                 price_change_5m: float) -> Dict:
-        """Deteksi reversal dan conflict patterns"""
+        """Deteksi reversal dan conflict patterns (dict + bitmask PATTERN_* di key 'mask')"""
+        
+        # Subexpression yang dipakai berulang
+        bd = raw_breakdown
+        nlq = near_long_liq
+        nsq = near_short_liq
+        ob_strong_bid = ob_bias == "STRONG_BID"
+        ob_strong_ask = ob_bias == "STRONG_ASK"
+        premium_bias_short = premium_bias == "SHORT_DOMINANT" or premium_bias == "SHORT_BIAS"
+        premium_bias_long = premium_bias == "LONG_DOMINANT" or premium_bias == "LONG_BIAS"
         
         # 🔴 OVERBOUGHT REVERSAL - Top formation
-        overbought_reversal = (
-            change_24h > 30 and
-            raw_breakdown and
-            near_long_liq and
-            premium < -0.2
-        )
+        overbought_reversal = change_24h > 30 and bd and nlq and premium < -0.2
         
         # 🔵 OVERSOLD REVERSAL - Bottom formation
-        oversold_reversal = (
-            change_24h < -20 and
-            not raw_breakdown and
-            near_short_liq and
-            premium > 0.2
-        )
+        oversold_reversal = change_24h < -20 and not bd and nsq and premium > 0.2
         
         # 🎯 BID LIQUIDITY TRAP (FIX BTRUSDT)
-        bid_liquidity_trap = (
-            ob_bias == "STRONG_BID" and
-            premium_bias in ["SHORT_DOMINANT", "SHORT_BIAS"] and
-            price_change_5m < 0 and
-            (raw_breakdown or near_long_liq)
-        )
+        bid_liquidity_trap = ob_strong_bid and premium_bias_short and price_change_5m < 0 and (bd or nlq)
         
         # 🎯 ASK LIQUIDITY TRAP
-        ask_liquidity_trap = (
-            ob_bias == "STRONG_ASK" and
-            premium_bias in ["LONG_DOMINANT", "LONG_BIAS"] and
-            price_change_5m > 0 and
-            (not raw_breakdown or near_short_liq)
-        )
+        ask_liquidity_trap = ob_strong_ask and premium_bias_long and price_change_5m > 0 and (not bd or nsq)
         
         # ⚔️ CONFLICT DETECTION
-        bid_vs_premium_conflict = (
-            ob_bias in ["STRONG_BID", "BID"] and
-            premium_bias in ["SHORT_DOMINANT", "SHORT_BIAS"]
-        )
-        
-        ask_vs_premium_conflict = (
-            ob_bias in ["STRONG_ASK", "ASK"] and
-            premium_bias in ["LONG_DOMINANT", "LONG_BIAS"]
-        )
+        bid_vs_premium_conflict = (ob_strong_bid or ob_bias == "BID") and premium_bias_short
+        ask_vs_premium_conflict = (ob_strong_ask or ob_bias == "ASK") and premium_bias_long
         
         # 💀 EXTREME OVERBOUGHT CASCADE
-        extreme_overbought_cascade = (
-            change_24h > 50 and
-            raw_breakdown and
-            near_long_liq and
-            premium < -0.5
-        )
+        extreme_overbought_cascade = change_24h > 50 and bd and nlq and premium < -0.5
         
         # 💀 EXTREME OVERSOLD CASCADE
-        extreme_oversold_cascade = (
-            change_24h < -40 and
-            not raw_breakdown and
-            near_short_liq and
-            premium > 0.5
+        extreme_oversold_cascade = change_24h < -40 and not bd and nsq and premium > 0.5
+        
+        mask = (
+            (overbought_reversal << 0) |
+            (oversold_reversal << 1) |
+            (bid_liquidity_trap << 2) |
+            (ask_liquidity_trap << 3) |
+            (bid_vs_premium_conflict << 4) |
+            (ask_vs_premium_conflict << 5) |
+            (extreme_overbought_cascade << 6) |
+            (extreme_oversold_cascade << 7)
         )
         
         return {
+            "mask": mask,
             "overbought_reversal": overbought_reversal,
             "oversold_reversal": oversold_reversal,
             "bid_liquidity_trap": bid_liquidity_trap,
@@ -398,225 +873,286 @@ class MarketStructureAnalyzer:
             "extreme_overbought_cascade": extreme_overbought_cascade,
             "extreme_oversold_cascade": extreme_oversold_cascade
         }
+    
+    @staticmethod
+    def detect_reversal_patterns_batch(change_24h: Sequence[float], raw_breakdown: Sequence[bool],
+                                       near_long_liq: Sequence[bool], near_short_liq: Sequence[bool],
+                                       premium: Sequence[float], ob_bias: Sequence[int],
+                                       premium_bias: Sequence[int],
+                                       price_change_5m: Sequence[float]) -> np.ndarray:
+        """
+        Versi vektor detect_reversal_patterns untuk banyak simbol / bar sekaligus (batch, backtest)
+        ob_bias / premium_bias berupa kode dari OB_BIAS_CODES / PREMIUM_BIAS_CODES
+        Return matrix bool (N, 8), kolom urut bit PATTERN_* - mask per baris:
+        np.packbits(result, axis=1, bitorder="little")[:, 0]
+        """
+        c24 = np.asarray(change_24h, dtype=np.float64)
+        bd = np.asarray(raw_breakdown, dtype=bool)
+        nlq = np.asarray(near_long_liq, dtype=bool)
+        nsq = np.asarray(near_short_liq, dtype=bool)
+        prem = np.asarray(premium, dtype=np.float64)
+        ob = np.asarray(ob_bias, dtype=np.int8)
+        pb = np.asarray(premium_bias, dtype=np.int8)
+        chg5 = np.asarray(price_change_5m, dtype=np.float64)
+        
+        out = np.empty((len(c24), 8), dtype=bool)
+        if NUMBA_AVAILABLE:
+            _reversal_batch_kernel(c24, bd, nlq, nsq, prem, ob, pb, chg5, out)
+            return out
+        
+        out[:, 0] = (c24 > 30) & bd & nlq & (prem < -0.2)           # overbought_reversal
+        out[:, 1] = (c24 < -20) & ~bd & nsq & (prem > 0.2)          # oversold_reversal
+        out[:, 2] = (ob == 2) & (pb < 0) & (chg5 < 0) & (bd | nlq)  # bid_liquidity_trap
+        out[:, 3] = (ob == -2) & (pb > 0) & (chg5 > 0) & (~bd | nsq)  # ask_liquidity_trap
+        out[:, 4] = (ob > 0) & (pb < 0)                             # bid_vs_premium_conflict
+        out[:, 5] = (ob < 0) & (pb > 0)                             # ask_vs_premium_conflict
+        out[:, 6] = (c24 > 50) & bd & nlq & (prem < -0.5)           # extreme_overbought_cascade
+        out[:, 7] = (c24 < -40) & ~bd & nsq & (prem > 0.5)          # extreme_oversold_cascade
+        return out
 
 
 # ================= DECISION ENGINE =================
-class DecisionEngine:
-    """Probability-based decision engine dengan priority hierarchy"""
-    
-    def __init__(self):
-        self.opinion = "NEUTRAL"
-        self.reason = ""
-        self.confidence = "LOW"
-        self.liquidation_alert = "⚪ NO SIGNAL"
-        self.valid_breakdown = False
-        self.fake_breakdown = False
-    
-    def evaluate(self, data: Dict) -> Dict:
-        """Evaluate all conditions with proper priority"""
-        
-        # ============================================
-        # 🚨 PRIORITY 0: EXTREME REVERSAL & CONFLICT
-        # ============================================
-        
-        # 💀 EXTREME OVERBOUGHT CASCADE (50%+)
-        if data['patterns'].get('extreme_overbought_cascade', False):
-            self._set_decision("SHORT", "EXTREME_OVERBOUGHT_CASCADE_REVERSAL", "VERY_HIGH",
-                              "💀 EXTREME OVERBOUGHT - MAJOR TOP", valid_breakdown=True)
-        
-        # 💀 EXTREME OVERSOLD CASCADE (-40%-)
-        elif data['patterns'].get('extreme_oversold_cascade', False):
-            self._set_decision("LONG", "EXTREME_OVERSOLD_CASCADE_REVERSAL", "VERY_HIGH",
-                              "💀 EXTREME OVERSOLD - MAJOR BOTTOM", fake_breakdown=True)
-        
-        # 🔴 OVERBOUGHT REVERSAL (30%+)
-        elif data['patterns'].get('overbought_reversal', False):
-            self._set_decision("SHORT", "OVERBOUGHT_TOP_REVERSAL", "VERY_HIGH",
-                              "🚨 TOP FORMATION - REVERSAL", valid_breakdown=True)
-        
-        # 🔵 OVERSOLD REVERSAL (-20%-)
-        elif data['patterns'].get('oversold_reversal', False):
-            self._set_decision("LONG", "OVERSOLD_BOTTOM_REVERSAL", "VERY_HIGH",
-                              "🚨 BOTTOM FORMATION - REVERSAL", fake_breakdown=True)
-        
-        # 🎯 BID LIQUIDITY TRAP (FIX BTRUSDT)
-        elif data['patterns'].get('bid_liquidity_trap', False):
-            self._set_decision("SHORT", "BID_LIQUIDITY_TRAP_DISTRIBUTION", "HIGH",
-                              "🎯 BID DOMINANT TAPI PREMIUM NEGATIF - DISTRIBUTION", 
-                              valid_breakdown=True)
+# Sentinel untuk rule conflict: nilai breakdown ikut structure.raw_breakdown
+FROM_RAW_BREAKDOWN = "FROM_RAW_BREAKDOWN"
+FROM_NOT_RAW_BREAKDOWN = "FROM_NOT_RAW_BREAKDOWN"
+
+# Hasil rule: (opinion, reason, confidence, alert, valid_breakdown, fake_breakdown)
+# Slot breakdown berisi bool atau sentinel FROM_* (di-resolve di decide)
+DecisionRow = Tuple[str, str, str, str, Union[bool, str], Union[bool, str]]
+
+# Rule table urut prioritas: (predicate, DecisionRow)
+# Rule pertama yang predicate-nya True menang
+DECISION_RULES: Tuple[Tuple[Callable[[Dict], Any], DecisionRow], ...] = (
+    # ============================================
+    # 🚨 PRIORITY 0: EXTREME REVERSAL & CONFLICT
+    # ============================================
+    # 💀 EXTREME OVERBOUGHT CASCADE (50%+)
+    (lambda d: d['patterns']['mask'] & PATTERN_EXTREME_OVERBOUGHT_CASCADE,
+     ("SHORT", "EXTREME_OVERBOUGHT_CASCADE_REVERSAL", "VERY_HIGH", "💀 EXTREME OVERBOUGHT - MAJOR TOP", True, False)),
+    # 💀 EXTREME OVERSOLD CASCADE (-40%-)
+    (lambda d: d['patterns']['mask'] & PATTERN_EXTREME_OVERSOLD_CASCADE,
+     ("LONG", "EXTREME_OVERSOLD_CASCADE_REVERSAL", "VERY_HIGH", "💀 EXTREME OVERSOLD - MAJOR BOTTOM", False, True)),
+    # 🔴 OVERBOUGHT REVERSAL (30%+)
+    (lambda d: d['patterns']['mask'] & PATTERN_OVERBOUGHT_REVERSAL,
+     ("SHORT", "OVERBOUGHT_TOP_REVERSAL", "VERY_HIGH", "🚨 TOP FORMATION - REVERSAL", True, False)),
+    # 🔵 OVERSOLD REVERSAL (-20%-)
+    (lambda d: d['patterns']['mask'] & PATTERN_OVERSOLD_REVERSAL,
+     ("LONG", "OVERSOLD_BOTTOM_REVERSAL", "VERY_HIGH", "🚨 BOTTOM FORMATION - REVERSAL", False, True)),
+    # 🎯 BID LIQUIDITY TRAP (FIX BTRUSDT)
+    (lambda d: d['patterns']['mask'] & PATTERN_BID_LIQUIDITY_TRAP,
+     ("SHORT", "BID_LIQUIDITY_TRAP_DISTRIBUTION", "HIGH", "🎯 BID DOMINANT TAPI PREMIUM NEGATIF - DISTRIBUTION", True, False)),
+    # 🎯 ASK LIQUIDITY TRAP
+    (lambda d: d['patterns']['mask'] & PATTERN_ASK_LIQUIDITY_TRAP,
+     ("LONG", "ASK_LIQUIDITY_TRAP_ABSORPTION", "HIGH", "🎯 ASK DOMINANT TAPI PREMIUM POSITIF - ABSORPTION", False, True)),
+    # ⚔️ CONFLICT RESOLUTION - Premium lebih penting
+    (lambda d: d['patterns']['mask'] & PATTERN_BID_VS_PREMIUM_CONFLICT,
+     ("SHORT", "CONFLICT_BID_VS_PREMIUM_PREMIUM_WINS", "MEDIUM", "⚠️ BID DOMINANT TAPI SHORT PREMIUM - FOLLOW PREMIUM",
+      FROM_RAW_BREAKDOWN, False)),
+    (lambda d: d['patterns']['mask'] & PATTERN_ASK_VS_PREMIUM_CONFLICT,
+     ("LONG", "CONFLICT_ASK_VS_PREMIUM_PREMIUM_WINS", "MEDIUM", "⚠️ ASK DOMINANT TAPI LONG PREMIUM - FOLLOW PREMIUM",
+      False, FROM_NOT_RAW_BREAKDOWN)),
+    
+    # ============================================
+    # 🚨 PRIORITY 1: SQUEEZE SETUPS
+    # ============================================
+    (lambda d: d['setups'].get('short_squeeze', False),
+     ("LONG", "SHORT_SQUEEZE_BUILDUP", "VERY_HIGH", "🔥 SHORT SQUEEZE IMMINENT", False, True)),
+    (lambda d: d['setups'].get('long_squeeze', False),
+     ("SHORT", "LONG_SQUEEZE_BUILDUP", "VERY_HIGH", "🔥 LONG SQUEEZE IMMINENT", True, False)),
+    
+    # ============================================
+    # 🚨 PRIORITY 2: LIQUIDITY BAIT
+    # ============================================
+    (lambda d: d['bait'].get('bait_buy', False),
+     ("LONG", "LIQUIDITY_BAIT_ABSORPTION", "HIGH", "🎯 BUY LIQUIDITY BAIT DETECTED", False, True)),
+    (lambda d: d['bait'].get('bait_sell', False),
+     ("SHORT", "LIQUIDITY_BAIT_DISTRIBUTION", "HIGH", "🎯 SELL LIQUIDITY BAIT DETECTED", True, False)),
+    
+    # ============================================
+    # 🚨 PRIORITY 3: ORDERBOOK DOMINANCE
+    # ============================================
+    (lambda d: d['ob'].get('bias') == "STRONG_BID",
+     ("LONG", "STRONG_BUY_PRESSURE", "HIGH", "📊 EXTREME BID DOMINANCE", False, False)),
+    (lambda d: d['ob'].get('bias') == "STRONG_ASK",
+     ("SHORT", "STRONG_SELL_PRESSURE", "HIGH", "📊 EXTREME ASK DOMINANCE", False, False)),
+    
+    # ============================================
+    # 🚨 PRIORITY 4: PREMIUM + ORDERBOOK CONFIRMATION
+    # ============================================
+    (lambda d: d['premium'].get('bias') == "LONG_DOMINANT" and d['ob'].get('sentiment') == "BULLISH",
+     ("LONG", "PREMIUM_OB_CONFIRMATION", "HIGH", "💰 LONG DOMINANT CONFIRMED", False, False)),
+    (lambda d: d['premium'].get('bias') == "SHORT_DOMINANT" and d['ob'].get('sentiment') == "BEARISH",
+     ("SHORT", "PREMIUM_OB_CONFIRMATION", "HIGH", "💰 SHORT DOMINANT CONFIRMED", False, False)),
+    
+    # ============================================
+    # 🚨 PRIORITY 5: EMA TREND
+    # ============================================
+    (lambda d: d['ema_trend'] == "UP" and d['ob'].get('sentiment') != "BEARISH",
+     ("LONG", "EMA_UPTREND_CONFIRMATION", "MEDIUM", "📈 UPTREND STRUCTURE", False, False)),
+    (lambda d: d['ema_trend'] == "DOWN" and d['ob'].get('sentiment') != "BULLISH",
+     ("SHORT", "EMA_DOWNTREND_CONFIRMATION", "MEDIUM", "📉 DOWNTREND STRUCTURE", False, False)),
+    
+    # ============================================
+    # 🚨 PRIORITY 6: LIQUIDATION ZONES
+    # ============================================
+    (lambda d: d['liq_zones'].get('near_long_liq', False) and d['ob'].get('sentiment') == "BEARISH",
+     ("SHORT", "LONG_LIQ_CASCADE", "MEDIUM", "⚠️ LONG LIQUIDATION ZONE", True, False)),
+    (lambda d: d['liq_zones'].get('near_short_liq', False) and d['ob'].get('sentiment') == "BULLISH",
+     ("LONG", "SHORT_LIQ_CASCADE", "MEDIUM", "⚠️ SHORT LIQUIDATION ZONE", False, True)),
+    
+    # ============================================
+    # 🚨 PRIORITY 7: ORDERBOOK BIAS
+    # ============================================
+    (lambda d: d['ob'].get('sentiment') == "BULLISH_BIAS",
+     ("LONG", "OB_BUY_PRESSURE", "LOW", "📊 BID DOMINANT", False, False)),
+    (lambda d: d['ob'].get('sentiment') == "BEARISH_BIAS",
+     ("SHORT", "OB_SELL_PRESSURE", "LOW", "📊 ASK DOMINANT", False, False)),
+)
+
+# Default kalau tidak ada rule yang cocok
+DEFAULT_DECISION: DecisionRow = ("NEUTRAL", "NO_CLEAR_SIGNAL", "LOW", "⚪ NO SIGNAL", False, False)
+
+
+def decide(data: Dict) -> Tuple[str, str, str, str, bool, bool]:
+    """
+    Probability-based decision dengan priority hierarchy (lihat DECISION_RULES)
+    Stateless - return (opinion, reason, confidence, liquidation_alert, valid_breakdown, fake_breakdown)
+    """
+    opinion, reason, confidence, alert, valid_rule, fake_rule = next(
+        (decision for predicate, decision in DECISION_RULES if predicate(data)),
+        DEFAULT_DECISION
+    )
+    
+    # Rule conflict: breakdown flag tergantung struktur harga (sentinel -> bool)
+    raw_breakdown = bool(data['structure'].get('raw_breakdown', False))
+    valid_breakdown = raw_breakdown if valid_rule == FROM_RAW_BREAKDOWN else bool(valid_rule)
+    fake_breakdown = (not raw_breakdown) if fake_rule == FROM_NOT_RAW_BREAKDOWN else bool(fake_rule)
+    
+    # Anti-countertrend filters
+    try:
+        # Jangan SHORT di area oversold dengan bid dominant
+        if (opinion == "SHORT" and 
+            data.get('change_24h', 0) < -10 and 
+            data['ob'].get('sentiment') == "BULLISH" and
+            not data['structure'].get('raw_breakdown', False)):
+            opinion = "LONG"
+            reason = f"ANTI_OVERSOLD_SHORT_{reason}"
+            fake_breakdown = True
         
-        # 🎯 ASK LIQUIDITY TRAP
-        elif data['patterns'].get('ask_liquidity_trap', False):
-            self._set_decision("LONG", "ASK_LIQUIDITY_TRAP_ABSORPTION", "HIGH",
-                              "🎯 ASK DOMINANT TAPI PREMIUM POSITIF - ABSORPTION",
-                              fake_breakdown=True)
-        
-        # ⚔️ CONFLICT RESOLUTION - Premium lebih penting
-        elif data['patterns'].get('bid_vs_premium_conflict', False):
-            self._set_decision("SHORT", "CONFLICT_BID_VS_PREMIUM_PREMIUM_WINS", "MEDIUM",
-                              "⚠️ BID DOMINANT TAPI SHORT PREMIUM - FOLLOW PREMIUM",
-                              valid_breakdown=data['structure'].get('raw_breakdown', False))
-        
-        elif data['patterns'].get('ask_vs_premium_conflict', False):
-            self._set_decision("LONG", "CONFLICT_ASK_VS_PREMIUM_PREMIUM_WINS", "MEDIUM",
-                              "⚠️ ASK DOMINANT TAPI LONG PREMIUM - FOLLOW PREMIUM",
-                              fake_breakdown=not data['structure'].get('raw_breakdown', False))
-        
-        # ============================================
-        # 🚨 PRIORITY 1: SQUEEZE SETUPS
-        # ============================================
-        elif data['setups'].get('short_squeeze', False):
-            self._set_decision("LONG", "SHORT_SQUEEZE_BUILDUP", "VERY_HIGH",
-                              "🔥 SHORT SQUEEZE IMMINENT", fake_breakdown=True)
-        
-        elif data['setups'].get('long_squeeze', False):
-            self._set_decision("SHORT", "LONG_SQUEEZE_BUILDUP", "VERY_HIGH",
-                              "🔥 LONG SQUEEZE IMMINENT", valid_breakdown=True)
-        
-        # ============================================
-        # 🚨 PRIORITY 2: LIQUIDITY BAIT
-        # ============================================
-        elif data['bait'].get('bait_buy', False):
-            self._set_decision("LONG", "LIQUIDITY_BAIT_ABSORPTION", "HIGH",
-                              "🎯 BUY LIQUIDITY BAIT DETECTED", fake_breakdown=True)
-        
-        elif data['bait'].get('bait_sell', False):
-            self._set_decision("SHORT", "LIQUIDITY_BAIT_DISTRIBUTION", "HIGH",
-                              "🎯 SELL LIQUIDITY BAIT DETECTED", valid_breakdown=True)
-        
-        # ============================================
-        # 🚨 PRIORITY 3: ORDERBOOK DOMINANCE
-        # ============================================
-        elif data['ob'].get('bias') == "STRONG_BID":
-            self._set_decision("LONG", "STRONG_BUY_PRESSURE", "HIGH",
-                              "📊 EXTREME BID DOMINANCE")
-        
-        elif data['ob'].get('bias') == "STRONG_ASK":
-            self._set_decision("SHORT", "STRONG_SELL_PRESSURE", "HIGH",
-                              "📊 EXTREME ASK DOMINANCE")
-        
-        # ============================================
-        # 🚨 PRIORITY 4: PREMIUM + ORDERBOOK CONFIRMATION
-        # ============================================
-        elif (data['premium'].get('bias') == "LONG_DOMINANT" and 
-              data['ob'].get('sentiment') == "BULLISH"):
-            self._set_decision("LONG", "PREMIUM_OB_CONFIRMATION", "HIGH",
-                              "💰 LONG DOMINANT CONFIRMED")
-        
-        elif (data['premium'].get('bias') == "SHORT_DOMINANT" and 
-              data['ob'].get('sentiment') == "BEARISH"):
-            self._set_decision("SHORT", "PREMIUM_OB_CONFIRMATION", "HIGH",
-                              "💰 SHORT DOMINANT CONFIRMED")
-        
-        # ============================================
-        # 🚨 PRIORITY 5: EMA TREND
-        # ============================================
-        elif data['ema_trend'] == "UP" and data['ob'].get('sentiment') != "BEARISH":
-            self._set_decision("LONG", "EMA_UPTREND_CONFIRMATION", "MEDIUM",
-                              "📈 UPTREND STRUCTURE")
-        
-        elif data['ema_trend'] == "DOWN" and data['ob'].get('sentiment') != "BULLISH":
-            self._set_decision("SHORT", "EMA_DOWNTREND_CONFIRMATION", "MEDIUM",
-                              "📉 DOWNTREND STRUCTURE")
-        
-        # ============================================
-        # 🚨 PRIORITY 6: LIQUIDATION ZONES
-        # ============================================
-        elif data['liq_zones'].get('near_long_liq', False) and data['ob'].get('sentiment') == "BEARISH":
-            self._set_decision("SHORT", "LONG_LIQ_CASCADE", "MEDIUM",
-                              "⚠️ LONG LIQUIDATION ZONE", valid_breakdown=True)
-        
-        elif data['liq_zones'].get('near_short_liq', False) and data['ob'].get('sentiment') == "BULLISH":
-            self._set_decision("LONG", "SHORT_LIQ_CASCADE", "MEDIUM",
-                              "⚠️ SHORT LIQUIDATION ZONE", fake_breakdown=True)
-        
-        # ============================================
-        # 🚨 PRIORITY 7: ORDERBOOK BIAS
-        # ============================================
-        elif data['ob'].get('sentiment') == "BULLISH_BIAS":
-            self._set_decision("LONG", "OB_BUY_PRESSURE", "LOW",
-                              "📊 BID DOMINANT")
-        
-        elif data['ob'].get('sentiment') == "BEARISH_BIAS":
-            self._set_decision("SHORT", "OB_SELL_PRESSURE", "LOW",
-                              "📊 ASK DOMINANT")
-        
-        # Default
-        else:
-            self._set_decision("NEUTRAL", "NO_CLEAR_SIGNAL", "LOW", "⚪ NO SIGNAL")
-        
-        # Apply anti-countertrend filters
-        self._apply_filters(data)
-        
-        return self._get_result()
-    
-    def _set_decision(self, opinion: str, reason: str, confidence: str,
-                     alert: str, valid_breakdown: bool = False, 
-                     fake_breakdown: bool = False):
-        """Set decision parameters"""
-        self.opinion = opinion
-        self.reason = reason
-        self.confidence = confidence
-        self.liquidation_alert = alert
-        self.valid_breakdown = valid_breakdown
-        self.fake_breakdown = fake_breakdown
-    
-    def _apply_filters(self, data: Dict):
-        """Anti-countertrend filters"""
-        try:
-            # Jangan SHORT di area oversold dengan bid dominant
-            if (self.opinion == "SHORT" and 
-                data.get('change_24h', 0) < -10 and 
-                data['ob'].get('sentiment') == "BULLISH" and
-                not data['structure'].get('raw_breakdown', False)):
-                self.opinion = "LONG"
-                self.reason = f"ANTI_OVERSOLD_SHORT_{self.reason}"
-                self.fake_breakdown = True
-            
-            # Jangan LONG di area overbought dengan ask dominant
-            if (self.opinion == "LONG" and 
-                data.get('change_24h', 0) > 10 and 
-                data['ob'].get('sentiment') == "BEARISH" and
-                data['structure'].get('raw_breakdown', False)):
-                self.opinion = "SHORT"
-                self.reason = f"ANTI_OVERBOUGHT_LONG_{self.reason}"
-                self.valid_breakdown = True
-        except:
-            pass
+        # Jangan LONG di area overbought dengan ask dominant
+        if (opinion == "LONG" and 
+            data.get('change_24h', 0) > 10 and 
+            data['ob'].get('sentiment') == "BEARISH" and
+            data['structure'].get('raw_breakdown', False)):
+            opinion = "SHORT"
+            reason = f"ANTI_OVERBOUGHT_LONG_{reason}"
+            valid_breakdown = True
+    except:
+        pass
     
-    def _get_result(self) -> Dict:
-        """Return decision result"""
-        return {
-            "opinion": self.opinion,
-            "reason": self.reason,
-            "confidence": self.confidence,
-            "liquidation_alert": self.liquidation_alert,
-            "valid_breakdown": self.valid_breakdown,
-            "fake_breakdown": self.fake_breakdown
-        }
+    return opinion, reason, confidence, alert, valid_breakdown, fake_breakdown
+
+
+# ================= SNAPSHOT =================
+@dataclass(slots=True)
+class Snapshot:
+    """Hasil analyze_symbol - slotted (lebih kecil dari dict), diserialisasi langsung oleh orjson"""
+    time: str
+    symbol: str
+    price: float
+    ob_ratio: float
+    ob_bias: str
+    ob_sentiment: str
+    buy_sell_ratio: float
+    buys: int
+    sells: int
+    premium: float
+    premium_bias: str
+    premium_risk: str
+    funding_rate: float
+    ema_slope: float
+    ema_trend: str
+    change_24h: float
+    change_1m: float
+    change_5m: float
+    change_15m: float
+    failed_high: bool
+    raw_breakdown: bool
+    near_long_liq: bool
+    near_short_liq: bool
+    long_liq_distance: float
+    short_liq_distance: float
+    is_short_squeeze: bool
+    is_long_squeeze: bool
+    liquidity_bait_buy: bool
+    liquidity_bait_sell: bool
+    overbought_reversal: bool
+    oversold_reversal: bool
+    bid_liquidity_trap: bool
+    ask_liquidity_trap: bool
+    bid_vs_premium_conflict: bool
+    ask_vs_premium_conflict: bool
+    extreme_overbought_cascade: bool
+    extreme_oversold_cascade: bool
+    opinion: str
+    reason: str
+    confidence: str
+    liquidation_alert: str
+    valid_breakdown: bool
+    fake_breakdown: bool
 
 
 # ================= MAIN ANALYSIS FUNCTION =================
-def analyze_symbol(symbol: str) -> Optional[Dict]:
+_CLOCK = (0, "")  # (detik epoch, "HH:MM:SS") - strftime cukup sekali per detik
+
+def _clock_str() -> str:
+    """Jam lokal HH:MM:SS untuk field time di snapshot, di-cache per detik"""
+    global _CLOCK
+    
+    sec = int(time.time())
+    clock = _CLOCK
+    if sec != clock[0]:
+        clock = _CLOCK = (sec, time.strftime("%H:%M:%S", time.localtime(sec)))
+    return clock[1]
+
+def analyze_symbol(symbol: str, session: Optional[requests.Session] = None) -> Optional[Snapshot]:
     """
-    Main analysis function - returns snapshot dict
+    Main analysis function - returns Snapshot
     Production ready dengan error handling
+    session: requests.Session opsional (default: session shared per proses, lihat _get_session)
     """
     try:
-        fetcher = BinanceFetcher(symbol)
+        fetcher = BinanceFetcher(symbol, session=session)
+        
+        # Data live dari WebSocket kalau aktif dan fresh - tanpa HTTP sama sekali
+        streamed = _STREAM_CACHE.get(symbol) if _STREAM_CACHE is not None else None
+        ticker: Optional[Dict]
+        depth: Optional[Dict]
+        trades: Optional[Dict]
+        premium_data: Optional[Dict]
+        klines: Optional[Dict]
+        if streamed:
+            ticker, depth, trades, premium_data, klines = streamed
+        else:
+            # Fetch semua data secara paralel (I/O bound - tiap getter sudah handle error sendiri)
+            # 5 endpoint: depth (top 5) untuk ob ratio, ticker 24hr sekalian untuk harga
+            futures = [
+                _FETCH_POOL.submit(fetcher.get_24h_ticker),
+                _FETCH_POOL.submit(fetcher.get_depth),
+                _FETCH_POOL.submit(fetcher.get_trades_flow),
+                _FETCH_POOL.submit(fetcher.get_funding_premium),
+                _FETCH_POOL.submit(fetcher.get_klines, 20)
+            ]
+            ticker, depth, trades, premium_data, klines = [f.result() for f in futures]
         
-        # Fetch semua data
-        price = fetcher.get_price()
-        change_24h = fetcher.get_24h_change()
-        ob_ratio = fetcher.get_orderbook_ratio()
-        trades = fetcher.get_trades_flow()
-        premium_data = fetcher.get_funding_premium()
-        klines = fetcher.get_klines(20)
-        depth = fetcher.get_depth()
+        ticker = ticker or {}
+        price = ticker.get("price")
+        change_24h = ticker.get("change")
+        ob_ratio = _ratio_from_depth(depth)
         
         # Validasi data minimal
         if price is None:
-            print(f"❌ Failed to fetch price for {symbol}")
+            log.warning("❌ Failed to fetch price for %s", symbol)
             return None
         
         # Gunakan default value untuk data yang mungkin None
@@ -624,22 +1160,29 @@ def analyze_symbol(symbol: str) -> Optional[Dict]:
         ob_ratio = ob_ratio or 1.0
         trades = trades or {"buys": 0, "sells": 0, "ratio": 1.0}
         premium_data = premium_data or {"premium": 0.0, "funding": 0.0, "mark": price, "index": price}
-        klines = klines or {"highs": [price*1.01, price], "lows": [price*0.99, price], "closes": [price, price]}
+        klines = klines or {
+            "highs": np.array([price*1.01, price]),
+            "lows": np.array([price*0.99, price]),
+            "closes": np.array([price, price])
+        }
         depth = depth or {}
         
-        # Extract data dari klines
-        highs = klines.get("highs", [price*1.01])
-        lows = klines.get("lows", [price*0.99])
-        closes = klines.get("closes", [price, price])
-        current_close = closes[-1] if closes else price
+        # Extract data dari klines (np.ndarray float64)
+        highs = klines["highs"]
+        lows = klines["lows"]
+        closes = klines["closes"]
+        current_close = float(closes[-1]) if len(closes) else price
         
-        # Hitung prev high/low
-        prev_high = max(highs[-10:]) if len(highs) >= 10 else max(highs)
-        prev_low = min(lows[-10:]) if len(lows) >= 10 else min(lows)
+        # Hitung prev high/low (10 candle terakhir, atau semua kalau kurang)
+        prev_high = float(highs[-10:].max())
+        prev_low = float(lows[-10:].min())
+        raw_breakdown = current_close < prev_low
+        failed_high = current_close < prev_high
         
         # Technical analysis
         tech_analyzer = TechnicalAnalyzer()
         price_changes = tech_analyzer.get_price_changes(closes)
+        change_5m = price_changes["5m"]
         ema_slope, ema_trend = tech_analyzer.get_ema_trend(closes)
         liq_zones = tech_analyzer.get_liquidation_zones(highs, lows, current_close)
         
@@ -650,19 +1193,19 @@ def analyze_symbol(symbol: str) -> Optional[Dict]:
         
         # Pattern detection
         squeeze_setups = struct_analyzer.detect_squeeze_setups(
-            trades, premium_data["premium"], price_changes.get("5m", 0)
+            trades, premium_data["premium"], change_5m
         )
         
         bait_patterns = struct_analyzer.detect_liquidity_bait(
-            ob_sentiment["sentiment"], trades, price_changes.get("5m", 0),
-            current_close < prev_low, current_close < prev_high
+            ob_sentiment["sentiment"], trades, change_5m,
+            raw_breakdown, failed_high
         )
         
         reversal_patterns = struct_analyzer.detect_reversal_patterns(
-            change_24h, current_close < prev_low,
+            change_24h, raw_breakdown,
             liq_zones["near_long_liq"], liq_zones["near_short_liq"],
             premium_data["premium"], ob_sentiment["bias"], premium_sentiment["bias"],
-            price_changes.get("5m", 0)
+            change_5m
         )
         
         # Compile decision data
@@ -676,96 +1219,145 @@ def analyze_symbol(symbol: str) -> Optional[Dict]:
             "ema_trend": ema_trend,
             "liq_zones": liq_zones,
             "structure": {
-                "raw_breakdown": current_close < prev_low,
-                "failed_high": current_close < prev_high,
-                "price_change_5m": price_changes.get("5m", 0)
+                "raw_breakdown": raw_breakdown,
+                "failed_high": failed_high,
+                "price_change_5m": change_5m
             }
         }
         
         # Make decision
-        engine = DecisionEngine()
-        decision = engine.evaluate(decision_data)
+        opinion, reason, confidence, liquidation_alert, valid_breakdown, fake_breakdown = decide(decision_data)
         
         # Build snapshot
-        snapshot = {
-            "time": datetime.now().strftime("%H:%M:%S"),
-            "symbol": symbol,
-            "price": round(price, 2) if price else 0,
-            "ob_ratio": ob_ratio,
-            "ob_bias": ob_sentiment["bias"],
-            "ob_sentiment": ob_sentiment["sentiment"],
-            "buy_sell_ratio": trades["ratio"],
-            "buys": trades["buys"],
-            "sells": trades["sells"],
-            "premium": premium_data["premium"],
-            "premium_bias": premium_sentiment["bias"],
-            "premium_risk": premium_sentiment["risk"],
-            "funding_rate": premium_data["funding"],
-            "ema_slope": round(ema_slope, 6),
-            "ema_trend": ema_trend,
-            "change_24h": round(change_24h, 2),
-            "change_1m": round(price_changes.get("1m", 0), 2),
-            "change_5m": round(price_changes.get("5m", 0), 2),
-            "change_15m": round(price_changes.get("15m", 0), 2),
-            "failed_high": current_close < prev_high,
-            "raw_breakdown": current_close < prev_low,
-            "near_long_liq": liq_zones["near_long_liq"],
-            "near_short_liq": liq_zones["near_short_liq"],
-            "long_liq_distance": round(liq_zones["long_liq_distance"], 2),
-            "short_liq_distance": round(liq_zones["short_liq_distance"], 2),
-            "is_short_squeeze": squeeze_setups["short_squeeze"],
-            "is_long_squeeze": squeeze_setups["long_squeeze"],
-            "liquidity_bait_buy": bait_patterns["bait_buy"],
-            "liquidity_bait_sell": bait_patterns["bait_sell"],
-            "overbought_reversal": reversal_patterns["overbought_reversal"],
-            "oversold_reversal": reversal_patterns["oversold_reversal"],
-            "bid_liquidity_trap": reversal_patterns["bid_liquidity_trap"],
-            "ask_liquidity_trap": reversal_patterns["ask_liquidity_trap"],
-            "bid_vs_premium_conflict": reversal_patterns["bid_vs_premium_conflict"],
-            "ask_vs_premium_conflict": reversal_patterns["ask_vs_premium_conflict"],
-            "extreme_overbought_cascade": reversal_patterns["extreme_overbought_cascade"],
-            "extreme_oversold_cascade": reversal_patterns["extreme_oversold_cascade"],
-            "opinion": decision["opinion"],
-            "reason": decision["reason"],
-            "confidence": decision["confidence"],
-            "liquidation_alert": decision["liquidation_alert"],
-            "valid_breakdown": decision["valid_breakdown"],
-            "fake_breakdown": decision["fake_breakdown"]
-        }
+        snapshot = Snapshot(
+            time=_clock_str(),
+            symbol=symbol,
+            price=round(price, 2) if price else 0,
+            ob_ratio=ob_ratio,
+            ob_bias=ob_sentiment["bias"],
+            ob_sentiment=ob_sentiment["sentiment"],
+            buy_sell_ratio=trades["ratio"],
+            buys=trades["buys"],
+            sells=trades["sells"],
+            premium=premium_data["premium"],
+            premium_bias=premium_sentiment["bias"],
+            premium_risk=premium_sentiment["risk"],
+            funding_rate=premium_data["funding"],
+            ema_slope=round(ema_slope, 6),
+            ema_trend=ema_trend,
+            change_24h=round(change_24h, 2),
+            change_1m=round(price_changes["1m"], 2),
+            change_5m=round(change_5m, 2),
+            change_15m=round(price_changes["15m"], 2),
+            failed_high=failed_high,
+            raw_breakdown=raw_breakdown,
+            near_long_liq=liq_zones["near_long_liq"],
+            near_short_liq=liq_zones["near_short_liq"],
+            long_liq_distance=round(liq_zones["long_liq_distance"], 2),
+            short_liq_distance=round(liq_zones["short_liq_distance"], 2),
+            is_short_squeeze=squeeze_setups["short_squeeze"],
+            is_long_squeeze=squeeze_setups["long_squeeze"],
+            liquidity_bait_buy=bait_patterns["bait_buy"],
+            liquidity_bait_sell=bait_patterns["bait_sell"],
+            overbought_reversal=reversal_patterns["overbought_reversal"],
+            oversold_reversal=reversal_patterns["oversold_reversal"],
+            bid_liquidity_trap=reversal_patterns["bid_liquidity_trap"],
+            ask_liquidity_trap=reversal_patterns["ask_liquidity_trap"],
+            bid_vs_premium_conflict=reversal_patterns["bid_vs_premium_conflict"],
+            ask_vs_premium_conflict=reversal_patterns["ask_vs_premium_conflict"],
+            extreme_overbought_cascade=reversal_patterns["extreme_overbought_cascade"],
+            extreme_oversold_cascade=reversal_patterns["extreme_oversold_cascade"],
+            opinion=opinion,
+            reason=reason,
+            confidence=confidence,
+            liquidation_alert=liquidation_alert,
+            valid_breakdown=valid_breakdown,
+            fake_breakdown=fake_breakdown
+        )
         
         return snapshot
         
-    except Exception as e:
-        print(f"❌ analyze_symbol error for {symbol}: {e}")
+    except (requests.RequestException, KeyError, IndexError, TypeError, ValueError, ArithmeticError) as e:
+        # Data Binance tidak lengkap / format aneh -> None. Bug lain dibiarkan raise
+        # (caller di app.py sudah menangkapnya dan membalas error)
+        log.warning("❌ analyze_symbol error for %s: %s", symbol, e)
         return None
 
 
-# Popular symbols list
-POPULAR_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "BTRUSDT", "SOLUSDT", "DOGEUSDT"]
+def analyze_symbols(symbols: Sequence[str], session: Optional[requests.Session] = None) -> Dict[str, Optional[Snapshot]]:
+    """
+    Analisa banyak simbol sekaligus - semua simbol x endpoint jalan paralel
+    Return {symbol: Snapshot atau None}, urutan sama dengan input
+    """
+    # Weight Binance menit ini sudah tinggi - jangan tambah beban, hindari 429/ban IP
+    if _over_weight_budget():
+        log.warning("⚠️ Binance weight above %d, skipping batch of %d symbols", WEIGHT_BACKOFF, len(symbols))
+        return {symbol: None for symbol in symbols}
+    
+    def analyze_or_none(symbol: str) -> Optional[Snapshot]:
+        # Error tak terduga satu simbol (bug) jangan menggagalkan seluruh batch
+        try:
+            return analyze_symbol(symbol, session=session)
+        except Exception:
+            log.exception("❌ analyze_symbols: unexpected error for %s", symbol)
+            return None
+    
+    results = _SYMBOL_POOL.map(analyze_or_none, symbols)
+    return dict(zip(symbols, results))
+
+
+# Popular symbols list (tuple - read-only, dipakai bareng app.py dan stream cache)
+POPULAR_SYMBOLS = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "BTRUSDT", "SOLUSDT", "DOGEUSDT")
+
+
+def _print_result(result: Snapshot) -> None:
+    """Cetak ringkasan snapshot ke console"""
+    print("\n" + "="*70)
+    print(f"🔥 BINANCE LIQUIDATION HUNTER V14")
+    print("="*70)
+    print(f"SYMBOL : {result.symbol}")
+    print(f"TIME   : {result.time}")
+    print(f"PRICE  : ${result.price:,.2f}")
+    print("="*70)
+    print(f"🎯 OPINION     : {result.opinion}")
+    print(f"📌 REASON      : {result.reason}")
+    print(f"🔥 CONFIDENCE  : {result.confidence}")
+    print(f"⚠️ ALERT       : {result.liquidation_alert}")
+    print("="*70)
+    print(f"📊 OrderBook Ratio : {result.ob_ratio}x ({result.ob_bias})")
+    print(f"💰 Premium Basis   : {result.premium}% ({result.premium_bias})")
+    print(f"📈 24h Change      : {result.change_24h}%")
+    print("="*70)
+
+
+def _selftest(symbols: Sequence[str]) -> None:
+    """Analisa simbol langsung dari Binance (paralel lewat analyze_symbols) dan cetak hasilnya"""
+    print("🧪 Testing liquidation_hunter.py...")
+    started = time.perf_counter()
+    results = analyze_symbols(symbols)
+    
+    for sym, result in results.items():
+        if result:
+            _print_result(result)
+        else:
+            print(f"❌ Failed for {sym}")
+    print(f"⏱️ {len(symbols)} symbol(s) in {time.perf_counter() - started:.2f}s")
 
 
 # Untuk testing langsung
 if __name__ == "__main__":
-    print("🧪 Testing liquidation_hunter.py...")
-    symbol = input("Symbol (e.g. BTCUSDT): ").upper() or "BTCUSDT"
-    result = analyze_symbol(symbol)
-    
-    if result:
-        print("\n" + "="*70)
-        print(f"🔥 BINANCE LIQUIDATION HUNTER V14")
-        print("="*70)
-        print(f"SYMBOL : {result['symbol']}")
-        print(f"TIME   : {result['time']}")
-        print(f"PRICE  : ${result['price']:,.2f}")
-        print("="*70)
-        print(f"🎯 OPINION     : {result['opinion']}")
-        print(f"📌 REASON      : {result['reason']}")
-        print(f"🔥 CONFIDENCE  : {result['confidence']}")
-        print(f"⚠️ ALERT       : {result['liquidation_alert']}")
-        print("="*70)
-        print(f"📊 OrderBook Ratio : {result['ob_ratio']}x ({result['ob_bias']})")
-        print(f"💰 Premium Basis   : {result['premium']}% ({result['premium_bias']})")
-        print(f"📈 24h Change      : {result['change_24h']}%")
-        print("="*70)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="🔥 Binance Liquidation Hunter V14")
+    parser.add_argument("--selftest", action="store_true",
+                        help="hit Binance dan cetak snapshot (tanpa flag ini tidak ada request jaringan)")
+    parser.add_argument("symbols", nargs="*", default=["BTCUSDT"],
+                        help="simbol yang dianalisa (default BTCUSDT, ALL = POPULAR_SYMBOLS)")
+    args = parser.parse_args()
+    
+    if args.selftest:
+        # ALL: semua simbol populer dianalisa paralel, total ~ simbol paling lambat
+        symbols = [s.upper() for s in args.symbols]
+        _selftest(POPULAR_SYMBOLS if symbols == ["ALL"] else symbols)
     else:
-        print(f"❌ Failed for {symbol}")
+        parser.print_help()
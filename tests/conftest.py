@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul ada di root repo (bukan package) - supaya `import liquidation_hunter` / `import app` jalan
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
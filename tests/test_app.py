@@ -0,0 +1,159 @@
+import os
+import time
+
+import pytest
+
+os.environ.pop("API_ID", None)  # Tanpa Telegram: app jalan mode 'solo' dengan data dummy
+os.environ.pop("API_HASH", None)
+
+import app as whale_app
+
+
+def _msg(msg_id, pair, mtype="LONG"):
+    return {"id": msg_id, "pair": pair, "type": mtype}
+
+
+@pytest.fixture
+def empty_cache(monkeypatch):
+    """Cache whale kosong, dikembalikan ke isi semula setelah test"""
+    saved = list(whale_app._wm_buffer)
+    with whale_app._cache_lock:
+        whale_app._reset_cache_locked()
+        whale_app._publish_views_locked()
+    yield whale_app
+    with whale_app._cache_lock:
+        whale_app._reset_cache_locked()
+        whale_app._add_whale_messages_locked(saved)
+
+
+def test_views_published_as_one_snapshot(empty_cache):
+    before = empty_cache._whale_view
+    empty_cache.add_whale_messages([_msg(2, "ETHUSDT", "SHORT"), _msg(1, "BTCUSDT")])
+    messages, pair_view, (long_count, short_count, top_pairs) = empty_cache._whale_view
+    
+    assert before == ((), {}, (0, 0, ()))  # Snapshot lama tidak ikut berubah
+    assert [m["id"] for m in messages] == [2, 1]
+    assert set(pair_view) == {"ETHUSDT", "BTCUSDT"}
+    assert (long_count, short_count) == (1, 1)
+    assert sum(count for _, count in top_pairs) == len(messages)
+
+
+def test_stats_route_matches_alerts_route(empty_cache):
+    empty_cache.add_whale_messages([_msg(i, "BTCUSDT", "LONG" if i % 2 else "SHORT") for i in range(5, 0, -1)])
+    client = empty_cache.app.test_client()
+    
+    alerts = client.get("/whale-alerts").get_json()
+    stats = client.get("/whale-alerts/stats").get_json()["data"]
+    
+    assert alerts["total"] == stats["total_messages"] == 5
+    assert stats["long_signals"] + stats["short_signals"] == 5
+
+
+def _baseline_top_pairs(messages):
+    """Algoritma lama: scan cache (terbaru dulu) lalu sort stabil by count"""
+    pairs = {}
+    for msg in messages:
+        pairs[msg["pair"]] = pairs.get(msg["pair"], 0) + 1
+    return sorted(pairs.items(), key=lambda x: x[1], reverse=True)[:5]
+
+
+def test_top_pairs_tie_order_matches_full_scan(empty_cache):
+    # Dummy data: BTCUSDT, ETHUSDT, XRPUSDT masing-masing 1 pesan
+    empty_cache.add_whale_messages(whale_app.get_dummy_whale_data())
+    top_pairs = empty_cache.app.test_client().get("/whale-alerts/stats").get_json()["data"]["top_pairs"]
+    
+    assert [p["pair"] for p in top_pairs] == ["BTCUSDT", "ETHUSDT", "XRPUSDT"]
+
+
+def test_top_pairs_match_full_scan_with_eviction(empty_cache):
+    import random
+    
+    rng = random.Random(7)
+    pairs = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "BNBUSDT", "DOGEUSDT", "ADAUSDT"]
+    for batch in range(60):
+        batch_msgs = [_msg(batch * 10 + i, rng.choice(pairs)) for i in range(rng.randint(1, 8))]
+        empty_cache.add_whale_messages(batch_msgs[::-1])  # terbaru dulu
+        messages, _, (_, _, top_pairs) = empty_cache._whale_view
+        assert list(top_pairs) == _baseline_top_pairs(messages)
+
+
+def test_publish_sync_round_trip(empty_cache, monkeypatch, tmp_path):
+    from datetime import datetime
+    
+    monkeypatch.setattr(whale_app, "WHALE_SHARED_FILE", str(tmp_path / "whale_cache.json"))
+    monkeypatch.setattr(whale_app, "telegram_client", object())
+    monkeypatch.setattr(whale_app, "last_update_time", datetime(2024, 1, 2, 3, 4, 5))
+    monkeypatch.setattr(whale_app, "_shared_mtime", 0.0)
+    monkeypatch.setattr(whale_app, "_owner_connected", False)
+    
+    # Owner: isi cache lalu tulis ke file shared
+    monkeypatch.setattr(whale_app, "_whale_role", "owner")
+    whale_app.add_whale_messages([_msg(3, "ETHUSDT", "SHORT"), _msg(2, "BTCUSDT"), _msg(1, "ETHUSDT")])
+    whale_app.publish_whale_cache()
+    owner_view = whale_app._whale_view
+    
+    # Reader: cache lokal kosong, dimuat ulang dari file
+    monkeypatch.setattr(whale_app, "_whale_role", "reader")
+    with whale_app._cache_lock:
+        whale_app._wm_buffer.clear()
+        whale_app._pair_index.clear()
+        whale_app._publish_views_locked()
+    monkeypatch.setattr(whale_app, "last_update_time", None)
+    
+    client = whale_app.app.test_client()
+    home = client.get("/").get_json()  # "/" juga harus sync (status Telegram dari owner)
+    
+    assert whale_app._whale_view == owner_view
+    assert whale_app.last_update_time == datetime(2024, 1, 2, 3, 4, 5)
+    assert whale_app.telegram_connected()
+    assert home["telegram"] == "connected"
+
+
+def test_reader_takes_over_when_owner_lock_is_released(empty_cache, monkeypatch, tmp_path):
+    import fcntl
+    
+    lock_path = str(tmp_path / "whale_worker.lock")
+    monkeypatch.setattr(whale_app, "WHALE_LOCK_FILE", lock_path)
+    monkeypatch.setattr(whale_app, "WHALE_SHARED_FILE", str(tmp_path / "whale_cache.json"))
+    monkeypatch.setattr(whale_app, "_whale_role", "reader")
+    monkeypatch.setattr(whale_app, "_owner_lock_fd", None)
+    monkeypatch.setattr(whale_app, "_next_owner_try", 0.0)
+    started = []
+    monkeypatch.setattr(whale_app, "_start_telegram_owner", lambda: started.append(True))
+    
+    # Owner lama (mis. worker sebelum reload HUP) masih pegang lock
+    old_owner = open(lock_path, "w")
+    fcntl.flock(old_owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    whale_app.sync_whale_cache()
+    assert whale_app._whale_role == "reader"
+    
+    # Owner lama exit -> lock lepas; percobaan berikutnya (setelah WHALE_OWNER_RETRY) ambil alih
+    old_owner.close()
+    whale_app.sync_whale_cache()
+    assert whale_app._whale_role == "reader"  # Masih dalam jeda retry
+    
+    monkeypatch.setattr(whale_app, "_next_owner_try", 0.0)
+    whale_app.sync_whale_cache()
+    try:
+        assert whale_app._whale_role == "owner"
+        for _ in range(100):
+            if started:
+                break
+            time.sleep(0.01)
+        assert started == [True]
+    finally:
+        os.close(whale_app._owner_lock_fd)
+
+
+def test_poll_racing_push_keeps_cache_newest_first(empty_cache):
+    # Push handler memasukkan pesan 106 saat poll masih iterasi 105..103
+    empty_cache.add_whale_messages([_msg(106, "BTCUSDT")])
+    empty_cache.add_whale_messages([_msg(105, "ETHUSDT"), _msg(104, "BTCUSDT"), _msg(103, "SOLUSDT")])
+    empty_cache.add_whale_messages([_msg(107, "ETHUSDT"), _msg(102, "BTCUSDT")])
+    messages, pair_view, (long_count, _, _) = empty_cache._whale_view
+    
+    assert [m["id"] for m in messages] == [107, 106, 105, 104, 103, 102]
+    assert [m["id"] for m in pair_view["BTCUSDT"]] == [106, 104, 102]
+    assert long_count == 6
+    latest = empty_cache.app.test_client().get("/whale-alerts/latest").get_json()["data"]
+    assert latest["id"] == 107
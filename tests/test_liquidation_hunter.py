@@ -0,0 +1,180 @@
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import liquidation_hunter as lh
+
+
+class _FakeBinance(BaseHTTPRequestHandler):
+    """Server lokal: balas status/header dari `responses` dan catat tiap request"""
+    responses = []
+    hits = []
+    
+    def do_GET(self):
+        self.hits.append(self.path)
+        status, headers, body = self.responses[min(len(self.hits), len(self.responses)) - 1]
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def binance():
+    """Jalankan server palsu, kembalikan (fetcher, handler) - fetcher pakai session produksi (_get_session)"""
+    _FakeBinance.responses = []
+    _FakeBinance.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBinance)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    lh._BREAKER.clear()
+    lh._USED_WEIGHT[:] = [0, 0]
+    lh._clear_caches()
+    fetcher = lh.BinanceFetcher("BTCUSDT")
+    fetcher.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+    yield fetcher, _FakeBinance
+    
+    server.shutdown()
+    server.server_close()
+    lh._BREAKER.clear()
+
+
+def _timed_fetch(fetcher, endpoint="/fapi/v1/exchangeInfo"):
+    started = time.monotonic()
+    result = fetcher._fetch_remote(endpoint)
+    return result, time.monotonic() - started
+
+
+@pytest.mark.parametrize("status", [429, 418])
+def test_rate_limited_is_not_retried_and_opens_breaker(binance, status):
+    fetcher, server = binance
+    server.responses = [(status, {"Retry-After": "3"}, b"{}")]
+    
+    result, elapsed = _timed_fetch(fetcher)
+    
+    assert result is None
+    assert len(server.hits) == 1
+    assert elapsed < 1.0  # Tidak tidur selama Retry-After di thread fetch
+    assert lh._breaker_open("/fapi/v1/exchangeInfo")
+    
+    # Selama breaker terbuka, tidak ada request ke Binance
+    assert fetcher._fetch_remote("/fapi/v1/exchangeInfo") is None
+    assert len(server.hits) == 1
+
+
+def test_http_date_retry_after_opens_breaker(binance):
+    fetcher, server = binance
+    server.responses = [(429, {"Retry-After": formatdate(time.time() + 30, usegmt=True)}, b"{}")]
+    
+    assert fetcher._fetch_remote("/fapi/v1/exchangeInfo") is None
+    assert lh._breaker_open("/fapi/v1/exchangeInfo")
+    assert 20 < lh._BREAKER["/fapi/v1/exchangeInfo"][1] - time.monotonic() <= 31
+
+
+def test_server_error_retry_ignores_retry_after(binance):
+    fetcher, server = binance
+    server.responses = [(503, {"Retry-After": "3"}, b"{}"), (200, {}, b'{"ok": true}')]
+    
+    result, elapsed = _timed_fetch(fetcher)
+    
+    assert result == {"ok": True}
+    assert len(server.hits) == 2
+    assert elapsed < 1.5
+    assert not lh._breaker_open("/fapi/v1/exchangeInfo")
+
+
+def test_consecutive_server_errors_open_breaker(binance):
+    fetcher, server = binance
+    server.responses = [(500, {}, b"{}")]
+    
+    for _ in range(lh.BREAKER_THRESHOLD):
+        assert fetcher._fetch_remote("/fapi/v1/exchangeInfo") is None
+    hits = len(server.hits)
+    
+    assert lh._breaker_open("/fapi/v1/exchangeInfo")
+    assert fetcher._fetch_remote("/fapi/v1/exchangeInfo") is None
+    assert len(server.hits) == hits
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("7", 7.0),
+    ("-1", 0.0),
+    (None, lh.BREAKER_COOLDOWN),
+    ("soon", lh.BREAKER_COOLDOWN),
+])
+def test_retry_after_seconds(value, expected):
+    assert lh._retry_after_seconds(value) == expected
+
+
+def test_analyze_symbols_isolates_failing_symbol(monkeypatch):
+    def fake_analyze(symbol, session=None):
+        if symbol == "BADUSDT":
+            raise RuntimeError("stream cache exploded")
+        return symbol.lower()
+    
+    monkeypatch.setattr(lh, "analyze_symbol", fake_analyze)
+    monkeypatch.setattr(lh, "_USED_WEIGHT", [0, 0])
+    
+    result = lh.analyze_symbols(("BTCUSDT", "BADUSDT", "ETHUSDT"))
+    
+    assert result == {"BTCUSDT": "btcusdt", "BADUSDT": None, "ETHUSDT": "ethusdt"}
+    assert list(result) == ["BTCUSDT", "BADUSDT", "ETHUSDT"]
+
+
+@pytest.mark.parametrize("use_kernel", [True, False])
+def test_reversal_batch_matches_scalar(monkeypatch, use_kernel):
+    np = lh.np
+    monkeypatch.setattr(lh, "NUMBA_AVAILABLE", use_kernel)
+    ob_names = {code: name for name, code in lh.OB_BIAS_CODES.items()}
+    premium_names = {code: name for name, code in lh.PREMIUM_BIAS_CODES.items()}
+    
+    rng = np.random.default_rng(42)
+    n = 2000
+    change_24h = rng.uniform(-60, 60, n)
+    breakdown = rng.random(n) < 0.5
+    near_long = rng.random(n) < 0.5
+    near_short = rng.random(n) < 0.5
+    premium = rng.uniform(-1, 1, n)
+    ob_bias = rng.integers(-2, 3, n)
+    premium_bias = rng.integers(-2, 3, n)
+    change_5m = rng.uniform(-2, 2, n)
+    
+    batch = lh.MarketStructureAnalyzer.detect_reversal_patterns_batch(
+        change_24h, breakdown, near_long, near_short, premium, ob_bias, premium_bias, change_5m
+    )
+    masks = np.packbits(batch, axis=1, bitorder="little")[:, 0]
+    
+    for i in range(n):
+        scalar = lh.MarketStructureAnalyzer.detect_reversal_patterns(
+            float(change_24h[i]), bool(breakdown[i]), bool(near_long[i]), bool(near_short[i]),
+            float(premium[i]), ob_names[int(ob_bias[i])], premium_names[int(premium_bias[i])],
+            float(change_5m[i])
+        )
+        assert masks[i] == scalar["mask"], i
+    assert batch.any(axis=0).all()  # Semua pattern ter-cover oleh data acak
+
+
+@pytest.mark.parametrize("raw_breakdown", [True, False])
+def test_decide_resolves_breakdown_sentinels_to_bool(raw_breakdown):
+    patterns = lh.MarketStructureAnalyzer.detect_reversal_patterns(
+        0.0, raw_breakdown, False, False, -0.05, "BID", "SHORT_BIAS", 0.0
+    )
+    data = {
+        "change_24h": 0.0, "ob": lh.OB_BID, "premium": lh.PREMIUM_SHORT_BIAS,
+        "setups": {}, "bait": {}, "patterns": patterns, "ema_trend": "FLAT", "liq_zones": {},
+        "structure": {"raw_breakdown": raw_breakdown}
+    }
+    
+    opinion, reason, _, _, valid_breakdown, fake_breakdown = lh.decide(data)
+    
+    assert (opinion, reason) == ("SHORT", "CONFLICT_BID_VS_PREMIUM_PREMIUM_WINS")
+    assert valid_breakdown is raw_breakdown
+    assert fake_breakdown is False